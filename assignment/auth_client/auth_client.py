@@ -13,11 +13,15 @@ import hashlib
 
 import Ice
 
-Ice.loadSlice(
-    f"{os.path.dirname(os.path.realpath(__file__))}/../icegauntlet.ice"
+# add the assignment directory to the module search path
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
 )
 # pylint: disable=E0401
 # pylint: disable=C0413
+import slice_cache
+
+slice_cache.load()
 import IceGauntlet
 
 PASSWORD_SALT = """
@@ -27,6 +31,20 @@ words guarded please don’t steal
 """.strip()
 
 
+def calculate_hash(password: str) -> str:
+    """
+    Calculates the hash for the provided password
+    :param password Password for which the hash will be calculated for
+    :return The hash calculated for this password
+    """
+    if password is None:
+        return None
+    password_hash = hashlib.sha256()
+    password_hash.update(PASSWORD_SALT.encode("utf8"))
+    password_hash.update(password.encode("utf8"))
+    return password_hash.hexdigest()
+
+
 class Client(Ice.Application):
     """
     Authentication client
@@ -39,12 +57,7 @@ class Client(Ice.Application):
         :param password Password for which the hash will be calculated for
         :return The hash calculated for this password
         """
-        if password is None:
-            return None
-        password_hash = hashlib.sha256()
-        password_hash.update(PASSWORD_SALT.encode("utf8"))
-        password_hash.update(password.encode("utf8"))
-        return password_hash.hexdigest()
+        return calculate_hash(password)
 
     def run(self, args: list) -> int:
         """
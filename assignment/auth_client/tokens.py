@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# coding: utf8
+"""
+tokens: Obtains authentication tokens in-process, caching them on disk
+"""
+
+import os
+import json
+import hashlib
+import logging
+import time
+
+# importing the client also loads the Slice definitions
+from auth_client import calculate_hash
+
+# pylint: disable=E0401
+# pylint: disable=C0411
+import IceGauntlet
+
+DEFAULT_CACHE_FILE = os.path.join(
+    os.path.expanduser("~"), ".icegauntlet", "tokens.json"
+)
+# seconds a token is kept in the cache, the server confirms it on every use
+DEFAULT_TOKEN_LIFETIME = 120
+# tokens closer than this to their expiration are refreshed
+DEFAULT_REFRESH_MARGIN = 10
+
+
+class TokenCache:
+    """
+    Tokens stored on disk along with their expiration time
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_FILE,
+        lifetime: float = DEFAULT_TOKEN_LIFETIME,
+        margin: float = DEFAULT_REFRESH_MARGIN,
+    ):
+        """
+        Initializes the cache
+        :param path Cache file, None to keep tokens only in memory
+        :param lifetime Seconds a token stays valid after being issued
+        :param margin Seconds before expiration when a token is refreshed
+        """
+        self._path = path
+        self._lifetime = lifetime
+        self._margin = margin
+        self._tokens = {}
+        if path and os.path.isfile(path):
+            try:
+                with open(path, "r", encoding="utf8") as cache_file:
+                    self._tokens = json.load(cache_file)
+            except ValueError:
+                logging.warning("ignoring malformed token cache: %s", path)
+
+    @staticmethod
+    def key(
+        auth: IceGauntlet.AuthenticationPrx, user: str, password: str
+    ) -> str:
+        """
+        Computes the cache key of some credentials on a given authentication
+        server, so that a wrong password never matches a cached token
+        :param auth Authentication proxy
+        :param user Name of the user
+        :param password Password of the user
+        :return The cache key
+        """
+        credentials = hashlib.sha256(
+            f"{user}:{calculate_hash(password)}".encode("utf8")
+        ).hexdigest()
+        return f"{user}:{credentials}@{auth}"
+
+    def get(self, key: str) -> str:
+        """
+        Obtains a cached token
+        :param key Cache key (see key())
+        :return The token, or None if not cached or about to expire
+        """
+        entry = self._tokens.get(key)
+        if entry and entry["expires"] - self._margin > time.time():
+            return entry["token"]
+        return None
+
+    def drop(self, key: str):
+        """
+        Removes a cached token
+        :param key Cache key (see key())
+        """
+        self._tokens.pop(key, None)
+
+    def put(self, key: str, token: str):
+        """
+        Stores a token that has just been issued
+        :param key Cache key (see key())
+        :param token The new token
+        """
+        self._tokens[key] = {
+            "token": token,
+            "expires": time.time() + self._lifetime,
+        }
+
+    def save(self):
+        """
+        Writes the cache to disk, dropping expired tokens
+        """
+        if not self._path:
+            return
+        now = time.time()
+        self._tokens = {
+            key: entry
+            for key, entry in self._tokens.items()
+            if entry["expires"] > now
+        }
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, "w", encoding="utf8") as cache_file:
+            json.dump(self._tokens, cache_file)
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, self._path)
+
+
+class TokenProvider:
+    """
+    Obtains tokens from an authentication server, reusing cached ones
+    """
+
+    def __init__(
+        self, auth: IceGauntlet.AuthenticationPrx, cache: TokenCache = None
+    ):
+        """
+        Initializes the provider
+        :param auth Authentication proxy
+        :param cache Token cache, by default an in-memory one
+        """
+        self._auth = auth
+        self._cache = cache or TokenCache(path=None)
+
+    def token(self, user: str, password: str) -> str:
+        """
+        Obtains a valid token for a user
+        :param user Name of the user
+        :param password Password of the user
+        :return The token
+        :throws IceGauntlet.Unauthorized if the credentials are not valid
+        """
+        return self.tokens([(user, password)])[user]
+
+    def tokens(self, credentials: list) -> dict:
+        """
+        Obtains valid tokens for many users, requesting all the missing ones
+        at once over the same connection
+        :param credentials List of (user, password) tuples
+        :return A dictionary with the token of each user
+        :throws IceGauntlet.Unauthorized if any credentials are not valid
+        """
+        keys = {
+            user: TokenCache.key(self._auth, user, password)
+            for user, password in credentials
+        }
+        # the server may have revoked or expired cached tokens: check them
+        checks = {}
+        for user, _ in credentials:
+            token = self._cache.get(keys[user])
+            if token:
+                checks[user] = (token, self._auth.isValidAsync(token))
+
+        tokens = {}
+        pending = {}
+        for user, password in credentials:
+            if user in checks:
+                token, check = checks[user]
+                if check.result():
+                    logging.debug("using cached token for user %s", user)
+                    tokens[user] = token
+                    continue
+                self._cache.drop(keys[user])
+            logging.debug("requesting token for user %s", user)
+            pending[user] = self._auth.getNewTokenAsync(
+                user, calculate_hash(password)
+            )
+
+        try:
+            for user, future in pending.items():
+                tokens[user] = future.result()
+                self._cache.put(keys[user], tokens[user])
+        finally:
+            self._cache.save()
+        return tokens
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+# coding: utf8
+"""
+auth_server: Executes the authentication servant
+"""
+
+import os
+import sys
+import argparse
+import logging
+import hashlib
+import hmac
+import json
+import math
+import secrets
+import threading
+import time
+import Ice
+
+# add the assignment directory to the module search path
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+)
+# pylint: disable=E0401
+# pylint: disable=C0413
+import slice_cache
+
+slice_cache.load()
+import IceGauntlet
+
+# seconds a token stays valid after being issued
+DEFAULT_TOKEN_LIFETIME = 120
+# seconds between two consecutive expiration rounds
+WHEEL_TICK = 1.0
+# random bytes per token (tokens are URL-safe base64 strings)
+TOKEN_BYTES = 30
+SALT_BYTES = 16
+
+
+def _get_data_dir() -> str:
+    """
+    Obtains the permanent data directory path
+    :return The absolute path to the data directory
+    """
+    return os.path.abspath(
+        os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "data")
+    )
+
+
+class TimingWheel:
+    """
+    Ring of time slots. Keys are dropped into the slot in which they expire,
+    so every tick only visits the keys that are actually expiring.
+    """
+
+    def __init__(self, horizon: float, tick: float = WHEEL_TICK):
+        """
+        Initializes the wheel
+        :param horizon Largest delay that can be scheduled, in seconds
+        :param tick Duration of a single slot, in seconds
+        """
+        self._tick = tick
+        self._slots = [set() for _ in range(math.ceil(horizon / tick) + 1)]
+        self._cursor = 0
+
+    def schedule(self, key, delay: float) -> int:
+        """
+        Schedules the expiration of a key
+        :param key Key that will expire
+        :param delay Seconds from now until the key expires
+        :return The slot where the key has been stored
+        """
+        ticks = min(math.ceil(delay / self._tick), len(self._slots) - 1)
+        slot = (self._cursor + max(ticks, 1)) % len(self._slots)
+        self._slots[slot].add(key)
+        return slot
+
+    def cancel(self, key, slot: int):
+        """
+        Removes a scheduled key before it expires
+        :param key Key to be removed
+        :param slot Slot returned by schedule()
+        """
+        self._slots[slot].discard(key)
+
+    def advance(self) -> set:
+        """
+        Moves the wheel one slot forward
+        :return The keys that have expired
+        """
+        self._cursor = (self._cursor + 1) % len(self._slots)
+        expired = self._slots[self._cursor]
+        self._slots[self._cursor] = set()
+        return expired
+
+
+class TokenStore:
+    """
+    Thread-safe token registry with constant time lookups
+    """
+
+    def __init__(self, lifetime: float = DEFAULT_TOKEN_LIFETIME):
+        """
+        Initializes the token registry
+        :param lifetime Seconds a token stays valid
+        """
+        self._lifetime = lifetime
+        self._lock = threading.Lock()
+        # token -> (user, expiration time, wheel slot)
+        self._tokens = {}
+        # user -> last token issued
+        self._users = {}
+        self._wheel = TimingWheel(lifetime)
+
+    def issue(self, user: str) -> str:
+        """
+        Issues a new token for a user, revoking the previous one
+        :param user Owner of the token
+        :return The new token
+        """
+        token = secrets.token_urlsafe(TOKEN_BYTES)
+        expiration = time.monotonic() + self._lifetime
+        with self._lock:
+            self._revoke(user)
+            slot = self._wheel.schedule(token, self._lifetime)
+            self._tokens[token] = (user, expiration, slot)
+            self._users[user] = token
+        return token
+
+    def is_valid(self, token: str) -> bool:
+        """
+        Checks whether a token exists and has not expired yet
+        :param token Token to check
+        :return True if the token is valid
+        """
+        # dict lookups are atomic, so the hot path does not take the lock
+        entry = self._tokens.get(token)
+        return entry is not None and entry[1] > time.monotonic()
+
+    def revoke(self, user: str):
+        """
+        Revokes the current token of a user (if any)
+        :param user Owner of the token
+        """
+        with self._lock:
+            self._revoke(user)
+
+    def _revoke(self, user: str):
+        """
+        Revokes the current token of a user, lock must be held
+        """
+        token = self._users.pop(user, None)
+        if token is None:
+            return
+        _, _, slot = self._tokens.pop(token)
+        self._wheel.cancel(token, slot)
+
+    def expire(self) -> int:
+        """
+        Drops the tokens that expire in the next wheel slot
+        :return The number of expired tokens
+        """
+        with self._lock:
+            expired = self._wheel.advance()
+            for token in expired:
+                user, _, _ = self._tokens.pop(token)
+                if self._users.get(user) == token:
+                    del self._users[user]
+        return len(expired)
+
+
+class UserStore:
+    """
+    Persistent user database holding salted password hashes
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the user database
+        :param path Path to the JSON file storing the users
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        self._users = {}
+        if os.path.isfile(path):
+            with open(path, "r", encoding="utf8") as users_file:
+                self._users = json.load(users_file)
+        logging.info("%d users loaded", len(self._users))
+
+    @staticmethod
+    def _salted_hash(salt: str, password_hash: str) -> str:
+        """
+        Computes the stored hash for a password hash sent by a client
+        :param salt Per-user salt, hex encoded
+        :param password_hash Password hash sent by the client
+        :return The salted hash, hex encoded
+        """
+        digest = hashlib.sha256(bytes.fromhex(salt))
+        digest.update(password_hash.encode("utf8"))
+        return digest.hexdigest()
+
+    def _save(self):
+        """
+        Writes the user database atomically, lock must be held
+        """
+        temp_path = f"{self._path}.tmp"
+        with open(temp_path, "w", encoding="utf8") as users_file:
+            json.dump(self._users, users_file, indent=2)
+        os.replace(temp_path, self._path)
+
+    def add(self, user: str):
+        """
+        Registers a user without password, which must be set by changing it
+        :param user Name of the user
+        """
+        with self._lock:
+            if user in self._users:
+                raise ValueError(f"user {user} already exists")
+            self._users[user] = {"salt": "", "hash": ""}
+            self._save()
+
+    def verify(self, user: str, password_hash: str) -> bool:
+        """
+        Checks the password hash of a user
+        :param user Name of the user
+        :param password_hash Password hash sent by the client
+        :return True if the password hash matches
+        """
+        entry = self._users.get(user)
+        if entry is None:
+            return False
+        if not entry["hash"]:
+            # the user has not set a password yet
+            return not password_hash
+        return hmac.compare_digest(
+            entry["hash"],
+            self._salted_hash(entry["salt"], password_hash or ""),
+        )
+
+    def change_password(
+        self, user: str, current_hash: str, new_hash: str
+    ) -> bool:
+        """
+        Changes the password of a user
+        :param user Name of the user
+        :param current_hash Current password hash
+        :param new_hash New password hash
+        :return True if the password has been changed
+        """
+        with self._lock:
+            if not self.verify(user, current_hash):
+                return False
+            salt = secrets.token_hex(SALT_BYTES)
+            self._users[user] = {
+                "salt": salt,
+                "hash": self._salted_hash(salt, new_hash),
+            }
+            self._save()
+        return True
+
+
+class AuthenticationI(IceGauntlet.Authentication):
+    """
+    Authentication servant
+    """
+
+    def __init__(self, users: UserStore, tokens: TokenStore):
+        """
+        Initializes this servant interface
+        :param users User database
+        :param tokens Token registry
+        """
+        self._users = users
+        self._tokens = tokens
+
+    # pylint: disable=C0103
+    # pylint: disable=W0613
+    def changePassword(
+        self,
+        user: str,
+        current_pass_hash: str,
+        new_pass_hash: str,
+        current=None,
+    ):
+        """
+        Changes the password of a user, revoking its token
+        :param user Name of the user
+        :param current_pass_hash Current password hash
+        :param new_pass_hash New password hash
+        """
+        if not self._users.change_password(
+            user, current_pass_hash, new_pass_hash
+        ):
+            logging.warning("invalid credentials for user %s", user)
+            raise IceGauntlet.Unauthorized()
+
+        logging.info("password changed for user %s", user)
+        self._tokens.revoke(user)
+
+    # pylint: disable=C0103
+    # pylint: disable=W0613
+    def getNewToken(self, user: str, password_hash: str, current=None) -> str:
+        """
+        Issues a new token for a user
+        :param user Name of the user
+        :param password_hash Password hash
+        :return The new token
+        """
+        if not self._users.verify(user, password_hash):
+            logging.warning("invalid credentials for user %s", user)
+            raise IceGauntlet.Unauthorized()
+
+        logging.info("issuing token for user %s", user)
+        return self._tokens.issue(user)
+
+    # pylint: disable=C0103
+    # pylint: disable=W0613
+    def isValid(self, token: str, current=None) -> bool:
+        """
+        Checks whether a token is valid
+        :param token Authentication token
+        :return True if the token is valid
+        """
+        return self._tokens.is_valid(token)
+
+
+class Server(Ice.Application):
+    """
+    Authentication server
+    """
+
+    def __init__(self, users_path: str, token_lifetime: float):
+        """
+        Initializes the server
+        :param users_path Path to the user database
+        :param token_lifetime Seconds a token stays valid
+        """
+        super().__init__()
+        self._users_path = users_path
+        self._token_lifetime = token_lifetime
+
+    def run(self, args: list) -> int:
+        """
+        Server loop
+        :params args An argument list passed by the communicator initialization
+        :return An exit code to the operating system
+        """
+        tokens = TokenStore(self._token_lifetime)
+        servant = AuthenticationI(UserStore(self._users_path), tokens)
+        adapter = self.communicator().createObjectAdapter(
+            "AuthenticationAdapter"
+        )
+        proxy = adapter.add(
+            servant, self.communicator().stringToIdentity("default")
+        )
+
+        adapter.addDefaultServant(servant, "")
+        adapter.activate()
+
+        stop = threading.Event()
+
+        def expiration_loop():
+            while not stop.wait(WHEEL_TICK):
+                expired = tokens.expire()
+                if expired:
+                    logging.debug("%d tokens expired", expired)
+
+        expiration = threading.Thread(target=expiration_loop, daemon=True)
+        expiration.start()
+
+        logging.debug("adapter ready (servant proxy: %s)", proxy)
+        print(f'"{proxy}"', flush=True)
+
+        logging.debug("entering server loop")
+        self.shutdownOnInterrupt()
+        self.communicator().waitForShutdown()
+
+        stop.set()
+        expiration.join()
+        logging.debug("bye!")
+        return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-v", action="store_true", help="displays debug traces"
+    )
+    parser.add_argument("--config", help="ZeroC Ice config file")
+    parser.add_argument(
+        "--users",
+        default=os.path.join(_get_data_dir(), "users.json"),
+        help="user database file",
+    )
+    parser.add_argument(
+        "--token-lifetime",
+        type=float,
+        default=DEFAULT_TOKEN_LIFETIME,
+        help="seconds a token stays valid",
+    )
+    parser.add_argument(
+        "--add-user",
+        metavar="USER",
+        help="register a user without password and exit",
+    )
+    arguments = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG)
+    if not arguments.v:
+        # disable all logging from levels CRITICAL and below, effectively
+        # disabling any kind of logging
+        logging.disable(logging.CRITICAL)
+
+    os.makedirs(
+        os.path.dirname(os.path.abspath(arguments.users)), exist_ok=True
+    )
+    if arguments.add_user:
+        try:
+            UserStore(arguments.users).add(arguments.add_user)
+        except ValueError as error:
+            print(f"error: {error}", file=sys.stderr)
+            sys.exit(1)
+        sys.exit(0)
+
+    server = Server(arguments.users, arguments.token_lifetime)
+    sys.exit(server.main(sys.argv[:1], configFile=arguments.config))
@@ -13,11 +13,15 @@ import logging
 import argparse
 import Ice
 
-Ice.loadSlice(
-    f"{os.path.dirname(os.path.realpath(__file__))}/../icegauntlet.ice"
+# add the assignment directory to the module search path
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
 )
 # pylint: disable=E0401
 # pylint: disable=C0413
+import slice_cache
+
+slice_cache.load()
 import IceGauntlet
 
 # add the top level directory to the module search path
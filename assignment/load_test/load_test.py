@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+# coding: utf8
+"""
+load_test: Measures the throughput and latency of the game and map servers
+"""
+
+import os
+import sys
+import argparse
+import logging
+import json
+import itertools
+import random
+import subprocess
+import threading
+import time
+import uuid
+import Ice
+
+# add the assignment directory to the module search path
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+)
+# pylint: disable=E0401
+# pylint: disable=C0413
+import slice_cache
+
+slice_cache.load()
+import IceGauntlet
+
+ASSIGNMENT_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
+)
+SAMPLE_ROOM = os.path.join(ASSIGNMENT_DIR, "..", "assets", "tutorial.json")
+
+OPERATIONS = ("getRoom", "publish", "remove")
+DEFAULT_MIX = "getRoom=8,publish=1,remove=1"
+PERCENTILES = (50, 95, 99)
+# errors of a single request, counted instead of stopping the worker
+REQUEST_ERRORS = (Ice.UserException, Ice.LocalException)
+
+
+class StubAuthenticationI(IceGauntlet.Authentication):
+    """
+    Authentication servant that accepts any token
+    """
+
+    # pylint: disable=C0103
+    # pylint: disable=W0613
+    def changePassword(
+        self,
+        user: str,
+        current_pass_hash: str,
+        new_pass_hash: str,
+        current=None,
+    ):
+        """
+        Accepts any password change
+        """
+
+    # pylint: disable=C0103
+    # pylint: disable=W0613
+    def getNewToken(self, user: str, password_hash: str, current=None) -> str:
+        """
+        Issues a random token for any user
+        :return A new token
+        """
+        return str(uuid.uuid4())
+
+    # pylint: disable=C0103
+    # pylint: disable=W0613
+    def isValid(self, token: str, current=None) -> bool:
+        """
+        Validates any token
+        :return Always true
+        """
+        return True
+
+
+class ServerProcess:
+    """
+    A server launched as a child process
+    """
+
+    def __init__(self, name: str, args: list):
+        """
+        Initializes the server process
+        :param name Name of the server directory and script
+        :param args Additional command line arguments for the server
+        """
+        self._name = name
+        self._args = args
+        self._process = None
+
+    def start(self) -> str:
+        """
+        Launches the server and waits for it to print its proxy
+        :return The proxy string of the server servant
+        """
+        script = os.path.join(ASSIGNMENT_DIR, self._name, f"{self._name}.py")
+        config = os.path.join(ASSIGNMENT_DIR, self._name, f"{self._name}.conf")
+        logging.debug("launching %s", script)
+        # the process outlives this method, it is released by stop()
+        # pylint: disable=consider-using-with
+        self._process = subprocess.Popen(
+            [sys.executable, script, "--config", config] + self._args,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        )
+        proxy = self._process.stdout.readline().strip().strip('"')
+        if not proxy:
+            self.stop()
+            raise RuntimeError(f"{self._name} did not report its proxy")
+
+        logging.info("%s ready (proxy: %s)", self._name, proxy)
+        return proxy
+
+    def stop(self):
+        """
+        Terminates the server process
+        """
+        if self._process is None:
+            return
+        self._process.terminate()
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        self._process = None
+
+
+class WorkerStats:
+    """
+    Latency samples and failures of the requests issued by a worker
+    """
+
+    def __init__(self):
+        """
+        Initializes empty statistics
+        """
+        self.samples = {operation: [] for operation in OPERATIONS}
+        self.failures = {operation: 0 for operation in OPERATIONS}
+        self.errors = {}
+
+    def record(self, operation: str, latency: float, error: str = None):
+        """
+        Annotates the result of a request
+        :param operation Name of the operation performed
+        :param latency Duration of the request, in seconds
+        :param error Name of the exception raised, if the request failed
+        """
+        if error:
+            self.failures[operation] += 1
+            self.errors[error] = self.errors.get(error, 0) + 1
+        else:
+            self.samples[operation].append(latency)
+
+    def merge(self, other: "WorkerStats"):
+        """
+        Adds the statistics of another worker to these ones
+        :param other Statistics to be added
+        """
+        for operation in OPERATIONS:
+            self.samples[operation].extend(other.samples[operation])
+            self.failures[operation] += other.failures[operation]
+        for error, count in other.errors.items():
+            self.errors[error] = self.errors.get(error, 0) + count
+
+
+class Worker(threading.Thread):
+    """
+    A load generating client with its own communicator (and connection)
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        index: int,
+        proxies: dict,
+        mix: dict,
+        room: dict,
+        deadlines: tuple,
+    ):
+        """
+        Initializes the worker
+        :param index Worker number, used to generate unique room names
+        :param proxies Proxy strings of the game and map servers
+        :param mix Relative weight of each operation
+        :param room Room used as template for published rooms
+        :param deadlines Warm-up end and run end, as monotonic timestamps
+        """
+        super().__init__(daemon=True)
+        self._proxies = proxies
+        self._mix = mix
+        self._room = room
+        self._deadlines = deadlines
+        self._room_names = (
+            f"load_test-{os.getpid()}-{index}-{count}"
+            for count in itertools.count(1)
+        )
+        self._published = []
+        self.stats = WorkerStats()
+
+    def _publish(self, maps: IceGauntlet.MapManagementPrx):
+        """
+        Publishes a room with a unique name
+        """
+        room_name = next(self._room_names)
+        self._room["room"] = room_name
+        maps.publish("", json.dumps(self._room))
+        self._published.append(room_name)
+
+    def _call(self, operation: str, game, maps):
+        """
+        Performs a single operation against the servers
+        :return The name of the operation actually performed
+        """
+        if operation == "getRoom":
+            game.getRoom()
+        elif operation == "publish" or not self._published:
+            # there is nothing to remove yet, so publish first
+            self._publish(maps)
+            return "publish"
+        else:
+            maps.remove("", self._published.pop())
+        return operation
+
+    def run(self):
+        """
+        Issues requests until the run deadline is reached
+        """
+        communicator = Ice.initialize()
+        try:
+            game = maps = None
+            operations = list(self._mix.keys())
+            weights = list(self._mix.values())
+            warmup_end, run_end = self._deadlines
+            if "getRoom" in operations:
+                game = IceGauntlet.GamePrx.checkedCast(
+                    communicator.stringToProxy(self._proxies["game"])
+                )
+            if set(operations) & {"publish", "remove"}:
+                maps = IceGauntlet.MapManagementPrx.checkedCast(
+                    communicator.stringToProxy(self._proxies["map"])
+                )
+
+            while True:
+                start = time.monotonic()
+                if start >= run_end:
+                    break
+                operation = random.choices(operations, weights)[0]
+                try:
+                    operation = self._call(operation, game, maps)
+                    error = None
+                except REQUEST_ERRORS as exception:
+                    error = type(exception).__name__
+                if start >= warmup_end:
+                    self.stats.record(
+                        operation, time.monotonic() - start, error
+                    )
+        finally:
+            self.cleanup(maps)
+            communicator.destroy()
+
+    def cleanup(self, maps: IceGauntlet.MapManagementPrx):
+        """
+        Removes every room still published by this worker
+        """
+        while self._published:
+            try:
+                maps.remove("", self._published.pop())
+            except IceGauntlet.RoomNotExists:
+                pass
+
+
+def parse_mix(mix: str) -> dict:
+    """
+    Parses a request mix such as "getRoom=8,publish=1,remove=1"
+    :param mix Comma separated list of operation=weight pairs
+    :return A dictionary with the weight of each operation
+    """
+    weights = {}
+    for entry in mix.split(","):
+        operation, _, weight = entry.partition("=")
+        operation = operation.strip()
+        if operation not in OPERATIONS:
+            raise ValueError(f"unknown operation: {operation}")
+        weights[operation] = float(weight or 1)
+    if sum(weights.values()) <= 0:
+        raise ValueError("request mix does not have any weight")
+    return {op: weight for op, weight in weights.items() if weight > 0}
+
+
+def summarize(samples: list, errors: int, duration: float) -> dict:
+    """
+    Computes throughput and latency percentiles from a list of samples
+    :param samples Latency of every successful request, in seconds
+    :param errors Number of failed requests
+    :param duration Length of the measured period, in seconds
+    :return A dictionary with the computed statistics
+    """
+    samples = sorted(samples)
+    summary = {
+        "requests": len(samples) + errors,
+        "errors": errors,
+        "throughput": round(len(samples) / duration, 2),
+        "latency_ms": None,
+    }
+    if samples:
+        latency = {
+            f"p{percentile}": samples[
+                min(len(samples) - 1, int(len(samples) * percentile / 100))
+            ]
+            for percentile in PERCENTILES
+        }
+        latency["mean"] = sum(samples) / len(samples)
+        latency["max"] = samples[-1]
+        summary["latency_ms"] = {
+            key: round(value * 1000, 3) for key, value in latency.items()
+        }
+    return summary
+
+
+def build_report(options: argparse.Namespace, mix: dict, stats: list) -> dict:
+    """
+    Aggregates the statistics of every worker
+    :param options Parsed command line options
+    :param mix Relative weight of each operation
+    :param stats List of WorkerStats
+    :return The report, as a JSON serializable dictionary
+    """
+    total = WorkerStats()
+    for worker_stats in stats:
+        total.merge(worker_stats)
+    return {
+        "clients": options.clients,
+        "warmup": options.warmup,
+        "duration": options.duration,
+        "mix": mix,
+        "total": summarize(
+            [s for samples in total.samples.values() for s in samples],
+            sum(total.failures.values()),
+            options.duration,
+        ),
+        "operations": {
+            operation: summarize(
+                total.samples[operation],
+                total.failures[operation],
+                options.duration,
+            )
+            for operation in OPERATIONS
+        },
+        "errors": total.errors,
+    }
+
+
+class LoadTest(Ice.Application):
+    """
+    Load generator for the game and map servers
+    """
+
+    def __init__(self, options: argparse.Namespace):
+        """
+        Initializes the load generator
+        :param options Parsed command line options
+        """
+        super().__init__()
+        self._options = options
+
+    def _seed_room(self, map_proxy: str, room: dict) -> str:
+        """
+        Publishes a room so that getRoom() always has something to return
+        :return The name of the published room
+        """
+        maps = IceGauntlet.MapManagementPrx.checkedCast(
+            self.communicator().stringToProxy(map_proxy)
+        )
+        room_name = f"load_test-{os.getpid()}-seed"
+        maps.publish("", json.dumps(dict(room, room=room_name)))
+        return room_name
+
+    def _start_servers(self, servers: list) -> dict:
+        """
+        Launches the servers that were not provided by the user
+        :param servers List where launched servers are appended
+        :return The proxy strings of the game and map servers
+        """
+        options = self._options
+        proxies = {"game": options.game_proxy, "map": options.map_proxy}
+        if not proxies["map"]:
+            adapter = self.communicator().createObjectAdapterWithEndpoints(
+                "StubAuthenticationAdapter", "tcp -h 127.0.0.1"
+            )
+            auth_proxy = adapter.addWithUUID(StubAuthenticationI())
+            adapter.activate()
+            servers.append(ServerProcess("map_server", [str(auth_proxy)]))
+            proxies["map"] = servers[-1].start()
+        if not proxies["game"]:
+            servers.append(ServerProcess("game_server", []))
+            proxies["game"] = servers[-1].start()
+        return proxies
+
+    def _run_workers(self, proxies: dict, mix: dict, room: dict) -> list:
+        """
+        Runs the workers until the end of the measured period
+        :param proxies Proxy strings of the game and map servers
+        :param mix Relative weight of each operation
+        :param room Room used as template for published rooms
+        :return The statistics of every worker
+        """
+        warmup_end = time.monotonic() + self._options.warmup
+        run_end = warmup_end + self._options.duration
+        workers = [
+            Worker(index, proxies, mix, dict(room), (warmup_end, run_end))
+            for index in range(self._options.clients)
+        ]
+        logging.debug("starting %d workers", len(workers))
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return [worker.stats for worker in workers]
+
+    def run(self, args: list) -> int:
+        """
+        Load test entry point
+        :param args An argument list passed by the communicator initialization
+        :return An exit code to the operating system
+        """
+        options = self._options
+        mix = parse_mix(options.mix)
+        with open(options.room, "r", encoding="utf8") as room_file:
+            room = json.load(room_file)
+
+        servers = []
+        try:
+            proxies = self._start_servers(servers)
+            seed = self._seed_room(proxies["map"], room)
+            stats = self._run_workers(proxies, mix, room)
+            IceGauntlet.MapManagementPrx.uncheckedCast(
+                self.communicator().stringToProxy(proxies["map"])
+            ).remove("", seed)
+        finally:
+            for server in servers:
+                server.stop()
+
+        output = json.dumps(build_report(options, mix, stats), indent=2)
+        if options.output:
+            with open(options.output, "w", encoding="utf8") as output_file:
+                output_file.write(output + "\n")
+        else:
+            print(output)
+        return 0
+
+
+def parse_commandline() -> argparse.Namespace:
+    """
+    Parses the command line
+    :return The parsed options
+    """
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-v", action="store_true", help="displays debug traces"
+    )
+    parser.add_argument(
+        "-c",
+        "--clients",
+        type=int,
+        default=4,
+        help="number of concurrent clients",
+    )
+    parser.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=10,
+        help="measured period in seconds",
+    )
+    parser.add_argument(
+        "-w",
+        "--warmup",
+        type=float,
+        default=2,
+        help="warm-up period in seconds (not measured)",
+    )
+    parser.add_argument(
+        "-m",
+        "--mix",
+        default=DEFAULT_MIX,
+        help=f"request mix as operation=weight pairs ({DEFAULT_MIX})",
+    )
+    parser.add_argument(
+        "-r",
+        "--room",
+        default=SAMPLE_ROOM,
+        help="room used as template for published rooms",
+    )
+    parser.add_argument(
+        "-o", "--output", help="write the JSON report to this file"
+    )
+    parser.add_argument(
+        "--game-proxy", help="use a running game server instead"
+    )
+    parser.add_argument("--map-proxy", help="use a running map server instead")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    arguments = parse_commandline()
+
+    logging.basicConfig(level=logging.DEBUG)
+    if not arguments.v:
+        # disable all logging from levels CRITICAL and below, effectively
+        # disabling any kind of logging
+        logging.disable(logging.CRITICAL)
+
+    load_test = LoadTest(arguments)
+    sys.exit(load_test.main(sys.argv[:1]))
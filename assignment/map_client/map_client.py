@@ -4,37 +4,163 @@
 map_client: Communicates with a map server to perform operations on maps
 """
 
-
 import os
 import sys
 import argparse
+import functools
+import glob
 import logging
+import threading
 
 import Ice
 
-Ice.loadSlice(
-    f"{os.path.dirname(os.path.realpath(__file__))}/../icegauntlet.ice"
+# add the assignment directory to the module search path
+sys.path.append(
+    os.path.join(os.path.dirname(os.path.realpath(__file__)), "..")
 )
 # pylint: disable=E0401
 # pylint: disable=C0413
+import slice_cache
+
+slice_cache.load()
 import IceGauntlet
 
+ERROR_MESSAGES = {
+    IceGauntlet.Unauthorized: "unauthorized",
+    IceGauntlet.RoomAlreadyExists: "room already exists",
+    IceGauntlet.RoomNotExists: "no such room",
+    IceGauntlet.InvalidRoomFormat: "invalid room format",
+}
+REMOTE_ERRORS = (
+    IceGauntlet.Unauthorized,
+    IceGauntlet.RoomAlreadyExists,
+    IceGauntlet.RoomNotExists,
+    IceGauntlet.InvalidRoomFormat,
+)
+
+DEFAULT_JOBS = 8
+
+
+def read_batch(source: str) -> list:
+    """
+    Reads the commands of a batch. The source can be a directory (every JSON
+    file inside is published), a command file or "-" to read commands from
+    the standard input. Each command line is either "publish <room_file>" or
+    "remove <room_name>", empty lines and lines starting with # are ignored.
+    :param source Directory, command file or "-"
+    :return A list of (action, data) tuples
+    """
+    if os.path.isdir(source):
+        return [
+            ("publish", room_file)
+            for room_file in sorted(glob.glob(os.path.join(source, "*.json")))
+        ]
+
+    if source == "-":
+        lines = sys.stdin.readlines()
+    else:
+        with open(source, "r", encoding="utf8") as batch_file:
+            lines = batch_file.readlines()
+
+    commands = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        action, _, data = line.partition(" ")
+        commands.append((action, data.strip()))
+    return commands
+
 
 class Client(Ice.Application):
     """
     Map client
     """
 
+    @staticmethod
+    def _batch_done(results: list, index: int, slots, future):
+        """
+        Stores the result of a pipelined request and frees its slot
+        :param results List of results of the batch
+        :param index Position of the request in the batch
+        :param slots Semaphore bounding the requests in flight
+        :param future Completed request
+        """
+        try:
+            future.result()
+            results[index] = None
+        except REMOTE_ERRORS as error:
+            results[index] = ERROR_MESSAGES[type(error)]
+        except Ice.Exception as error:
+            results[index] = str(error) or type(error).__name__
+        finally:
+            slots.release()
+
+    # pylint: disable=R1732
+    def _run_batch(
+        self,
+        maps: IceGauntlet.MapManagementPrx,
+        token: str,
+        source: str,
+        jobs: int,
+    ) -> int:
+        """
+        Runs a batch of commands over a single connection, keeping up to
+        jobs requests in flight
+        :param maps Map management proxy
+        :param token Authentication token
+        :param source Directory, command file or "-" (see read_batch)
+        :param jobs Maximum number of concurrent requests
+        :return An exit code to the operating system
+        """
+        commands = read_batch(source)
+        results = [None] * len(commands)
+        jobs = max(1, jobs)
+        slots = threading.BoundedSemaphore(jobs)
+
+        for index, (action, data) in enumerate(commands):
+            slots.acquire()
+            try:
+                if action == "publish":
+                    with open(data, "r", encoding="utf8") as room_file:
+                        future = maps.publishAsync(token, room_file.read())
+                elif action == "remove":
+                    future = maps.removeAsync(token, data)
+                else:
+                    raise ValueError(f"invalid action: {action}")
+            except (OSError, ValueError) as error:
+                results[index] = str(error)
+                slots.release()
+                continue
+            future.add_done_callback(
+                functools.partial(self._batch_done, results, index, slots)
+            )
+
+        # wait for the requests in flight
+        for _ in range(jobs):
+            slots.acquire()
+
+        failed = 0
+        for (action, data), error in zip(commands, results):
+            if error:
+                failed += 1
+                print(f"error: {action} {data}: {error}")
+            else:
+                print(f"ok: {action} {data}")
+
+        logging.info("%d commands, %d failed", len(commands), failed)
+        return 1 if failed else 0
+
     def run(self, args: list) -> int:
         """
         Client entry point
         :params args An argument list containing the communicator initialization parameters
         :return An exit code to the operating system
         """
-        token, proxy, action, data = args
-        if action not in ("publish", "remove"):
+        token, proxy, action, data, jobs = args
+        if action not in ("publish", "remove", "batch"):
             raise RuntimeError(
-                "invalid action (supported actions are publish and remove)"
+                "invalid action (supported actions are publish, remove and batch)"
             )
 
         maps_proxy = self.communicator().stringToProxy(proxy)
@@ -46,23 +172,17 @@ class Client(Ice.Application):
 
         logging.info("maps proxy OK")
 
+        if action == "batch":
+            return self._run_batch(maps, token, data, int(jobs))
+
         try:
             if action == "publish":
-                with open(data, "r") as room_file:
+                with open(data, "r", encoding="utf8") as room_file:
                     maps.publish(token, room_file.read())
             elif action == "remove":
                 maps.remove(token, data)
-        except IceGauntlet.Unauthorized:
-            print("error: unauthorized", file=sys.stderr)
-            return 1
-        except IceGauntlet.RoomAlreadyExists:
-            print("error: room already exists", file=sys.stderr)
-            return 1
-        except IceGauntlet.RoomNotExists:
-            print("error: no such room", file=sys.stderr)
-            return 1
-        except IceGauntlet.InvalidRoomFormat:
-            print("error: invalid room format", file=sys.stderr)
+        except REMOTE_ERRORS as error:
+            print(f"error: {ERROR_MESSAGES[type(error)]}", file=sys.stderr)
             return 1
 
         return 0
@@ -75,16 +195,23 @@ if __name__ == "__main__":
     )
     parser.add_argument("-t", help="authentication token")
     parser.add_argument("-p", help="maps proxy string")
+    parser.add_argument(
+        "-j",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="maximum concurrent requests in batch mode",
+    )
 
     parser.add_argument(
         "action",
-        metavar="publish|remove",
-        help="action to perform (publish, remove)",
+        metavar="publish|remove|batch",
+        help="action to perform (publish, remove, batch)",
     )
     parser.add_argument(
         "data",
-        metavar="room_name|room_data",
-        help="data associated with the action",
+        metavar="room_name|room_data|batch_source",
+        help="data associated with the action (batch reads commands from a "
+        "file, - for stdin, or publishes every room in a directory)",
     )
 
     arguments = parser.parse_args()
@@ -98,6 +225,12 @@ if __name__ == "__main__":
     client = Client()
     sys.exit(
         client.main(
-            [arguments.t, arguments.p, arguments.action, arguments.data]
+            [
+                arguments.t,
+                arguments.p,
+                arguments.action,
+                arguments.data,
+                str(arguments.j),
+            ]
         )
     )
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# coding: utf8
+"""
+slice_cache: Makes the IceGauntlet module importable, compiling the Slice
+definitions only when they change
+"""
+
+import os
+import sys
+import hashlib
+import logging
+import shutil
+import tempfile
+
+import Ice
+
+ASSIGNMENT_DIR = os.path.dirname(os.path.realpath(__file__))
+SLICE_FILE = os.path.join(ASSIGNMENT_DIR, "icegauntlet.ice")
+# Link to the modules of the current Slice, switched atomically on changes
+GENERATED_DIR = os.path.join(ASSIGNMENT_DIR, "generated")
+VERSION_PREFIX = "generated-"
+STAMP_FILE = "icegauntlet.sha256"
+
+
+def _slice_hash() -> str:
+    """
+    Computes the hash of the Slice definitions
+    :return The SHA-256 digest of the Slice file, hex encoded
+    """
+    with open(SLICE_FILE, "rb") as slice_file:
+        return hashlib.sha256(slice_file.read()).hexdigest()
+
+
+def _generated_hash() -> str:
+    """
+    Obtains the hash of the Slice definitions used to generate the modules
+    :return The stored digest, or None if there are no generated modules
+    """
+    try:
+        with open(
+            os.path.join(GENERATED_DIR, STAMP_FILE), "r", encoding="utf-8"
+        ) as stamp:
+            return stamp.read().strip()
+    except OSError:
+        return None
+
+
+def _version_dir(digest: str) -> str:
+    """
+    Computes the directory of the modules generated from a Slice version
+    :param digest Hash of the Slice file
+    :return Path of the versioned directory
+    """
+    return os.path.join(ASSIGNMENT_DIR, f"{VERSION_PREFIX}{digest[:16]}")
+
+
+def _switch_link(version_dir: str):
+    """
+    Points GENERATED_DIR to the given directory, replacing the link at once
+    so that other processes always find a complete set of modules
+    :param version_dir Directory of the generated modules
+    """
+    if os.path.isdir(GENERATED_DIR) and not os.path.islink(GENERATED_DIR):
+        # directory left by older versions, it cannot be replaced by a link
+        shutil.rmtree(GENERATED_DIR)
+    link = f"{GENERATED_DIR}.{os.getpid()}.tmp"
+    os.symlink(os.path.basename(version_dir), link)
+    try:
+        os.replace(link, GENERATED_DIR)
+    except OSError:
+        os.remove(link)
+        raise
+
+
+def _remove_stale(version_dir: str):
+    """
+    Removes the modules generated from other versions of the Slice
+    :param version_dir Directory of the current modules
+    """
+    for entry in os.listdir(ASSIGNMENT_DIR):
+        path = os.path.join(ASSIGNMENT_DIR, entry)
+        if entry.startswith(VERSION_PREFIX) and path != version_dir:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def compile_slice(digest: str = None) -> bool:
+    """
+    Generates the Python modules for the Slice definitions
+    :param digest Hash of the Slice file, computed if not provided
+    :return True if the modules have been generated
+    """
+    # pylint: disable=C0415
+    # pylint: disable=E0401
+    import IcePy
+
+    digest = digest or _slice_hash()
+    version_dir = _version_dir(digest)
+    output_dir = tempfile.mkdtemp(prefix=".generated-", dir=ASSIGNMENT_DIR)
+    try:
+        # --ice allows the reserved "Ice" prefix of the IceGauntlet module
+        if IcePy.compile(
+            ["slice2py", "--ice", "--output-dir", output_dir, SLICE_FILE]
+        ):
+            logging.warning("unable to compile %s", SLICE_FILE)
+            return False
+        with open(
+            os.path.join(output_dir, STAMP_FILE), "w", encoding="utf-8"
+        ) as stamp:
+            stamp.write(digest)
+
+        # the same version may have been generated by another process
+        if not os.path.isdir(version_dir):
+            os.rename(output_dir, version_dir)
+        _switch_link(version_dir)
+        _remove_stale(version_dir)
+        logging.debug("generated modules in %s", version_dir)
+        return True
+    except OSError as error:
+        logging.warning("unable to store generated modules: %s", error)
+        return False
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+
+def load():
+    """
+    Makes the IceGauntlet module importable, using the generated modules when
+    they are up to date and falling back to Ice.loadSlice() otherwise
+    """
+    digest = _slice_hash()
+    if _generated_hash() == digest or compile_slice(digest):
+        # resolve the link, later switches must not affect this process
+        modules_dir = os.path.realpath(GENERATED_DIR)
+        if modules_dir not in sys.path:
+            sys.path.insert(0, modules_dir)
+        return
+    Ice.loadSlice(SLICE_FILE)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG)
+    sys.exit(0 if compile_slice() else 1)
@@ -117,6 +117,7 @@ class Game:
         if self._current_state_ is not None:
             self._current_state_.suspend()
         self._current_state_ = self._states_[new_state](self)
+        game.pyxeltools.check_image_banks()
         self._current_state_.wake_up()
 
     def update(self):
@@ -9,10 +9,24 @@ from game.pyxeltools import CELL_SIZE
 from game.common import X, Y
 
 
+# Collision layers (bit flags)
+HEROES_LAYER = 1
+ITEMS_LAYER = 2
+DOORS_LAYER = 4
+ENEMIES_LAYER = 8
+ALL_LAYERS = HEROES_LAYER | ITEMS_LAYER | DOORS_LAYER | ENEMIES_LAYER
+
+
 class Body:
-    '''Base class of game objects body'''
-    def __init__(self):
+    '''
+        Base class of game objects body. Only dynamic bodies look for collisions, and only
+        with bodies whose layer is in their mask.
+    '''
+    def __init__(self, dynamic=False, layer=ITEMS_LAYER, mask=ALL_LAYERS):
         self._game_object_ = None
+        self.dynamic = dynamic
+        self.layer = layer
+        self.mask = mask
 
     @property
     def game_object(self):
@@ -38,6 +52,10 @@ class Body:
         '''Height in pixels of the body'''
         return self.size[1]
 
+    def interacts_with(self, other_body):
+        '''Return if this body has to look for collisions with other body'''
+        return self.dynamic and bool(self.mask & other_body.layer)
+
     def collides_with(self, other_game_object):
         '''Check if one game object collides with other'''
         raise NotImplementedError()
@@ -49,8 +67,8 @@ class Body:
 
 class Box(Body):
     '''A simple box with a fixed size in pixels'''
-    def __init__(self, size=(0, 0)):
-        super(Box, self).__init__()
+    def __init__(self, size=(0, 0), dynamic=False, layer=ITEMS_LAYER, mask=ALL_LAYERS):
+        super(Box, self).__init__(dynamic, layer, mask)
         self._size_ = size
 
     @property
@@ -78,19 +96,10 @@ class Box(Body):
         x1 = int((self.game_object.attribute[X] + self._size_[0] - 1) / CELL_SIZE)
         y0 = int(self.game_object.attribute[Y] / CELL_SIZE)
         y1 = int((self.game_object.attribute[Y] + self._size_[1] - 1) / CELL_SIZE)
-        # Get blocks at borders
-        try:
-            collides = {
-                self.game_object.room.block[y0][x0], self.game_object.room.block[y0][x1],
-                self.game_object.room.block[y1][x0], self.game_object.room.block[y1][x1]
-            }
-        except IndexError:
-            # This error is caused by out-of-map coordinate
-            collides = {True}
-        # Doors are not boolean blocks
-        doors = collides.difference({True, False})
+        # Get walls and doors at borders (out-of-map coordinates are walls)
+        blocked, doors = self.game_object.room.block.probe(
+            ((x0, y0), (x1, y0), (x0, y1), (x1, y1))
+        )
         for door in doors:
-            self.game_object.room.send_event(
-                ('collision', self.game_object.identifier, door)
-            )
-        return (not True in collides) and (not doors)
+            self.game_object.room.touch(self.game_object, door)
+        return (not blocked) and (not doors)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+
+'''
+    Packed asset bundle: pre-decoded sprite sheets, palette and rooms in a single file
+
+    Layout: header (magic, format version, index size), JSON index and payload. Sheets are
+    stored as palette indices (one byte per pixel), any other file is stored as is. The index
+    keeps the SHA-256 of every source file to detect outdated entries.
+'''
+
+import os
+import sys
+import glob
+import json
+import mmap
+import struct
+import hashlib
+import logging
+
+import game.assets
+
+
+BUNDLE_FILE = 'assets.bundle'
+
+_MAGIC_ = b'IGBUNDLE'
+_FORMAT_VERSION_ = 2
+_HEADER_ = struct.Struct('<8sII')
+
+IMAGE = 'image'
+DATA = 'data'
+
+# Opened bundle (False if there is no usable bundle)
+_CURRENT_BUNDLE_ = None
+
+
+def _source_version_(path):
+    try:
+        with open(path, 'rb') as contents:
+            return hashlib.sha256(contents.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class Bundle:
+    '''Read-only view of a bundle file'''
+    def __init__(self, bundle_file):
+        self._path_ = bundle_file
+        self._folder_ = os.path.dirname(bundle_file)
+        with open(bundle_file, 'rb') as contents:
+            self._data_ = mmap.mmap(contents.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_size = _HEADER_.unpack_from(self._data_)
+        if (magic != _MAGIC_) or (version != _FORMAT_VERSION_):
+            raise ValueError('Unsupported bundle file: {}'.format(bundle_file))
+        self._index_ = json.loads(
+            self._data_[_HEADER_.size:_HEADER_.size + index_size].decode('utf-8')
+        )
+        self._payload_ = _HEADER_.size + index_size
+        # Name -> result of is_current(), sources are hashed once per session
+        self._checked_ = {}
+
+    @property
+    def path(self):
+        '''Path of the bundle file'''
+        return self._path_
+
+    def __contains__(self, name):
+        return name in self._index_
+
+    def is_current(self, name):
+        '''Check that an entry exists and its source file (if present) has not changed'''
+        if name not in self._checked_:
+            self._checked_[name] = self._check_source_(name)
+        return self._checked_[name]
+
+    def _check_source_(self, name):
+        entry = self._index_.get(name, None)
+        if not entry:
+            return False
+        source = _source_version_(os.path.join(self._folder_, name))
+        if source and (source != entry['source']):
+            logging.warning('Bundled "{}" is outdated, rebuild the bundle'.format(name))
+            return False
+        return True
+
+    def _view_(self, entry):
+        start = self._payload_ + entry['offset']
+        return memoryview(self._data_)[start:start + entry['length']]
+
+    def image(self, name):
+        '''Get a bundled sheet as (width, height, palette indices)'''
+        entry = self._index_[name]
+        if entry['kind'] != IMAGE:
+            raise ValueError('Bundle entry is not an image: {}'.format(name))
+        return entry['width'], entry['height'], self._view_(entry)
+
+    def data(self, name):
+        '''Get contents of a bundled file'''
+        return bytes(self._view_(self._index_[name]))
+
+
+def get():
+    '''Get the bundle of the game (opened once), or None if not available'''
+    global _CURRENT_BUNDLE_
+    if _CURRENT_BUNDLE_ is None:
+        _CURRENT_BUNDLE_ = False
+        bundle_file = game.assets.search(BUNDLE_FILE)
+        if bundle_file:
+            try:
+                _CURRENT_BUNDLE_ = Bundle(bundle_file)
+            except (OSError, ValueError, struct.error) as error:
+                logging.warning('Cannot open asset bundle: {}'.format(error))
+    return _CURRENT_BUNDLE_ or None
+
+
+def lookup(name):
+    '''Get the bundle if it holds an up-to-date copy of the given asset, None otherwise'''
+    bundle = get()
+    if bundle and bundle.is_current(name):
+        return bundle
+    return None
+
+
+def build(assets_folder, bundle_file=None):
+    '''Pack PNG sheets and JSON files of a folder into a bundle'''
+    from PIL import Image
+    bundle_file = bundle_file or os.path.join(assets_folder, BUNDLE_FILE)
+    index = {}
+    chunks = []
+    offset = 0
+    for source in sorted(glob.glob(os.path.join(assets_folder, '*.png'))):
+        image = Image.open(source)
+        if image.mode not in ('P', 'L'):
+            logging.warning('Skipping "{}": not an indexed image'.format(source))
+            continue
+        chunks.append(image.tobytes())
+        index[os.path.basename(source)] = {
+            'kind': IMAGE, 'width': image.width, 'height': image.height
+        }
+    for source in sorted(glob.glob(os.path.join(assets_folder, '*.json'))):
+        with open(source, 'rb') as contents:
+            chunks.append(contents.read())
+        index[os.path.basename(source)] = {'kind': DATA}
+
+    for name, chunk in zip(index, chunks):
+        index[name].update({
+            'offset': offset,
+            'length': len(chunk),
+            'source': _source_version_(os.path.join(assets_folder, name))
+        })
+        offset += len(chunk)
+
+    index_data = json.dumps(index).encode('utf-8')
+    with open(bundle_file, 'wb') as output:
+        output.write(_HEADER_.pack(_MAGIC_, _FORMAT_VERSION_, len(index_data)))
+        output.write(index_data)
+        for chunk in chunks:
+            output.write(chunk)
+    return bundle_file
+
+
+def main():
+    '''Build the bundle of the assets folder given in commandline (or the default one)'''
+    if len(sys.argv) > 1:
+        assets_folder = sys.argv[1]
+    else:
+        palette = game.assets.search('palette.json')
+        if not palette:
+            logging.error('Assets folder not found!')
+            return 1
+        assets_folder = os.path.dirname(palette)
+    print('Bundle written: {}'.format(build(assets_folder)))
+    return 0
@@ -30,6 +30,13 @@ class Camera:
         '''Current postion of the camera target in the layer'''
         return self._position_
 
+    @property
+    def target(self):
+        '''Current position followed by the camera (in the layer)'''
+        if self._target_object_:
+            return self._target_object_.position
+        return self._target_
+
     def warp_to(self, position):
         '''Move camera target without traveling'''
         self._target_ = position
@@ -19,6 +19,7 @@ SPEED = 'speed'
 HERO_CLASS = 'class'
 TAGS = 'tags'
 TILE_ID = 'tile_id'
+DECORATION_TYPE = 'decoration_type'
 KEYS = 'keys'
 SCORE = 'score'
 LIFE = 'life'
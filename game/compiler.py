@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+
+'''
+    Room compiler: converts the tile grid of a room into the data used by the engine
+'''
+
+from array import array
+
+from game.common import EMPTY_TILE, AVAILABLE_OBJECT_IDS, NULL_TILE, WALL_TILES
+from game.pyxeltools import TILE_SIZE, tile_cells
+from game.artwork import NULL_CELL
+
+
+# Increase when the output of compile_room() changes
+COMPILER_VERSION = 2
+
+# Group of objects that are not doors
+NO_GROUP = -1
+
+# Adjacent tiles connected with every door tile
+DOOR_DIRECTION = {
+    19: [(0, -1)],
+    20: [(1, 0)],
+    21: [(0, -1), (1, 0)],
+    22: [(0, 1)],
+    23: [(0, -1), (0, 1)],
+    24: [(1, 0), (0, 1)],
+    25: [(0, -1), (1, 0), (0, 1)],
+    26: [(-1, 0)],
+    27: [(-1, 0), (0, -1)],
+    28: [(-1, 0), (1, 0)],
+    29: [(0, -1), (-1, 0), (1, 0)],
+    30: [(-1, 0), (0, 1)],
+    31: [(0, -1), (-1, 0), (0, 1)],
+    32: [(-1, 0), (0, 1), (1, 0)],
+    33: [(0, -1), (-1, 0), (0, 1), (1, 0)]
+}
+
+_SHADOW_ = [
+    EMPTY_TILE, EMPTY_TILE + 1, EMPTY_TILE + 2, EMPTY_TILE + 3,
+    EMPTY_TILE + 4, EMPTY_TILE + 5, EMPTY_TILE + 6, EMPTY_TILE + 5
+]
+
+# Cells of every tile, flattened: (top_left, top_right, bottom_left, bottom_right)
+_TILE_CELLS_ = [sum(tile_cells(tile_id), ()) for tile_id in range(NULL_TILE + 1)]
+_OBJECT_IDS_ = frozenset(AVAILABLE_OBJECT_IDS)
+_WALL_IDS_ = frozenset(WALL_TILES)
+
+
+class CompiledRoom:
+    '''Room ready to be used by the engine. Sizes are given in cells, arrays are row-major'''
+    def __init__(self, width, height, floor, shadows, block, objects, door_groups):
+        self.width = width
+        self.height = height
+        # Cells of the floor tilemap
+        self.floor = floor
+        # Cells of the decoration (shadows) tilemap
+        self.shadows = shadows
+        # 1 for every cell with a wall
+        self.block = block
+        # Map objects: (object_type, (x, y)) with position in pixels
+        self.objects = objects
+        # Group of connected doors of every object (NO_GROUP if it is not a door)
+        self.door_groups = door_groups
+
+    @property
+    def size(self):
+        '''Size of the room in cells'''
+        return (self.width, self.height)
+
+    def _rows_(self, cells, window=None):
+        left, top, width, height = window or (0, 0, self.width, self.height)
+        return [
+            cells[offset + left:offset + left + width]
+            for offset in range(top * self.width, (top + height) * self.width, self.width)
+        ]
+
+    def floor_rows(self, window=None):
+        '''Floor cells as a list of rows, window (left, top, width, height) defaults to the room'''
+        return self._rows_(self.floor, window)
+
+    def shadow_rows(self, window=None):
+        '''Shadow cells as a list of rows, window (left, top, width, height) defaults to the room'''
+        return self._rows_(self.shadows, window)
+
+
+def _shadow_row_(walls, y, tiles_width, shadows):
+    '''Put the shadows of tile row "y", walls of rows "y" and "y + 1" must be known'''
+    width = tiles_width * 2
+    row, below = y * tiles_width, (y + 1) * tiles_width
+    for x in range(1, tiles_width - 1):
+        if walls[row + x]:
+            continue
+        wall_distribution = (4 * walls[below + x]) + (2 * walls[below + x - 1]) + walls[row + x - 1]
+        if wall_distribution == 0:
+            continue
+        top_left, top_right, bottom_left, bottom_right = _TILE_CELLS_[_SHADOW_[wall_distribution]]
+        offset = (y * 2 * width) + (x * 2)
+        shadows[offset:offset + 2] = array('H', (top_left, top_right))
+        shadows[offset + width:offset + width + 2] = array('H', (bottom_left, bottom_right))
+
+
+def _find_(parents, node):
+    root = node
+    while parents[root] != root:
+        root = parents[root]
+    while parents[node] != root:
+        parents[node], node = root, parents[node]
+    return root
+
+
+def _group_doors_(doors, object_count):
+    '''Union-find of connected doors: {(x, y): (object_index, tile_id)} in tiles'''
+    parents = {index: index for index, _ in doors.values()}
+    for (x, y), (index, tile_id) in doors.items():
+        for dir_x, dir_y in DOOR_DIRECTION[tile_id]:
+            neighbour = doors.get((x + dir_x, y + dir_y), None)
+            if neighbour:
+                parents[_find_(parents, neighbour[0])] = _find_(parents, index)
+    door_groups = array('i', [NO_GROUP]) * object_count
+    group_ids = {}
+    for index in sorted(parents):
+        door_groups[index] = group_ids.setdefault(_find_(parents, index), len(group_ids))
+    return door_groups
+
+
+def compile_room(tile_rows):
+    '''Build a CompiledRoom from the "data" grid of a room in a single pass'''
+    tiles_width = max(len(row) for row in tile_rows)
+    tiles_height = len(tile_rows)
+    width, height = tiles_width * 2, tiles_height * 2
+
+    floor = array('H', [NULL_CELL]) * (width * height)
+    shadows = array('H', [NULL_CELL]) * (width * height)
+    walls = bytearray(tiles_width * tiles_height)
+    block = bytearray(width * height)
+    objects = []
+    doors = {}
+
+    for y, row in enumerate(tile_rows):
+        top = bottom = (y * 2 * width)
+        bottom += width
+        for x in range(tiles_width):
+            src_tile = row[x] if x < len(row) else NULL_TILE
+            if src_tile in _OBJECT_IDS_:
+                if src_tile in DOOR_DIRECTION:
+                    doors[(x, y)] = (len(objects), src_tile)
+                objects.append((src_tile, (x * TILE_SIZE, y * TILE_SIZE)))
+                src_tile = EMPTY_TILE
+            elif src_tile == NULL_TILE:
+                src_tile = EMPTY_TILE
+            elif src_tile in _WALL_IDS_:
+                walls[(y * tiles_width) + x] = 1
+                block[top + (x * 2):top + (x * 2) + 2] = b'\x01\x01'
+                block[bottom + (x * 2):bottom + (x * 2) + 2] = b'\x01\x01'
+            top_left, top_right, bottom_left, bottom_right = _TILE_CELLS_[src_tile]
+            floor[top + (x * 2)] = top_left
+            floor[top + (x * 2) + 1] = top_right
+            floor[bottom + (x * 2)] = bottom_left
+            floor[bottom + (x * 2) + 1] = bottom_right
+        # Shadows of previous row are known once this row is processed
+        if 1 < y < tiles_height:
+            _shadow_row_(walls, y - 1, tiles_width, shadows)
+
+    return CompiledRoom(
+        width, height, floor, shadows, block, objects, _group_doors_(doors, len(objects))
+    )
@@ -8,8 +8,9 @@
 
 from game.game_object import Decoration
 from game.sprite import animation
-from game.pyxeltools import MAP_ENTITIES
+from game.pyxeltools import MAP_ENTITIES, use_image_bank
 from game.artwork import SMOKE, EXPLOSION
+from game.common import DECORATION_TYPE
 
 
 _DECORATIONS_ = {
@@ -18,7 +19,27 @@ _DECORATIONS_ = {
 }
 
 
+# Killed decorations kept for reuse (up to POOL_SIZE per decoration type)
+POOL_SIZE = 16
+_POOL_ = {}
+
+
 def new(decoration, position):
-    '''Create new decoration object'''
+    '''Create new decoration object (recycling a killed one if available)'''
+    use_image_bank(MAP_ENTITIES)
+    pool = _POOL_.get(decoration, None)
+    if pool:
+        decoration_object = pool.pop()
+        decoration_object.restart(position)
+        return decoration_object
     speed, frames = _DECORATIONS_[decoration]
-    return Decoration(animation(MAP_ENTITIES, speed, frames), position)
+    decoration_object = Decoration(animation(MAP_ENTITIES, speed, frames), position)
+    decoration_object.attribute[DECORATION_TYPE] = decoration
+    return decoration_object
+
+
+def release(decoration_object):
+    '''Give back a killed decoration to be reused by new()'''
+    pool = _POOL_.setdefault(decoration_object.attribute.get(DECORATION_TYPE, None), [])
+    if len(pool) < POOL_SIZE:
+        pool.append(decoration_object)
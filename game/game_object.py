@@ -17,6 +17,10 @@ _STANDBY_ = 'stand_by'
 
 class GameObject:
     '''Base of game objects'''
+    # Objects that are not updatable are never updated by the Room(): their update() does
+    # nothing and they keep acting until they are killed
+    updatable = False
+
     def __init__(self, initial_position=(0, 0), identifier=None):
         self._id_ = identifier or str(uuid.uuid4())
         self._body_ = None
@@ -117,6 +121,10 @@ class GameObject:
         '''Render GameObject with given offset'''
         pass
 
+    def tick(self):
+        '''Advance one frame without rendering (GameObject is out of screen)'''
+        pass
+
 
 class Decoration(GameObject):
     '''GameObject with a single animation that is killed as soon as animation ends'''
@@ -130,12 +138,29 @@ class Decoration(GameObject):
     def acting(self):
         return not self._animation_.ended
 
+    @property
+    def size(self):
+        '''Size of the decoration'''
+        return self._animation_.size
+
+    def restart(self, position):
+        '''Play the decoration again at a given position (used to recycle it)'''
+        self.position = position
+        self._animation_.reset()
+        self._ready_to_kill_ = False
+
     def render(self, x_offset=0, y_offset=0):
         if self._ready_to_kill_:
             self.kill()
         self._animation_.render(self.attribute[X] + x_offset, self.attribute[Y] + y_offset)
         self._ready_to_kill_ = not self.acting
 
+    def tick(self):
+        if self._ready_to_kill_:
+            self.kill()
+        self._animation_.tick()
+        self._ready_to_kill_ = not self.acting
+
 
 class Item(GameObject):
     '''GameObject with one image or animation. Stores a state and a Box body'''
@@ -204,9 +229,14 @@ class Item(GameObject):
             self.attribute[X] + x_offset, self.attribute[Y] + y_offset
         )
 
+    def tick(self):
+        self._animations_[self._current_animation_].tick()
+
 
 class Actor(GameObject):
     '''Game object with state, animations per state, body and Steer'''
+    updatable = True
+
     def __init__(self, animations=None, initial_position=(0, 0), identifier=None):
         super(Actor, self).__init__(initial_position, identifier)
         animations = animations or {}
@@ -306,3 +336,6 @@ class Actor(GameObject):
         self.__anims__[self.__current_state__].render(
             self.attribute[X] + x_offset, self.attribute[Y] + y_offset
         )
+
+    def tick(self):
+        self.__anims__[self.__current_state__].tick()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+
+'''
+    Compact grids of room cells
+'''
+
+from array import array
+
+
+# Door slot of cells without door
+NO_DOOR = 0
+# Size of a door in cells
+DOOR_CELLS = 2
+
+
+class BlockGrid:
+    '''Wall mask (one byte per cell) and door grid (small door slots) of a room'''
+    def __init__(self, width, height, walls=None):
+        self.width = width
+        self.height = height
+        self._walls_ = bytearray(walls) if walls is not None else bytearray(width * height)
+        self._doors_ = array('H', [NO_DOOR]) * (width * height)
+        # Slot 0 is reserved for NO_DOOR
+        self._door_ids_ = [None]
+        self._free_slots_ = []
+        # Door identifier -> (slot, (x, y))
+        self._door_slots_ = {}
+
+    @classmethod
+    def from_compiled_room(cls, compiled_room):
+        '''Build the grid of a CompiledRoom()'''
+        return cls(compiled_room.width, compiled_room.height, compiled_room.block)
+
+    @property
+    def size(self):
+        '''Size of the grid in cells'''
+        return (self.width, self.height)
+
+    def _offset_(self, x, y):
+        if (0 <= x < self.width) and (0 <= y < self.height):
+            return (y * self.width) + x
+        return None
+
+    def is_wall(self, x, y):
+        '''Return if there is a wall in the cell, out-of-map cells are walls'''
+        offset = self._offset_(x, y)
+        return True if offset is None else self._walls_[offset] == 1
+
+    def door_at(self, x, y):
+        '''Get identifier of the door in the cell, or None'''
+        offset = self._offset_(x, y)
+        return None if offset is None else self._door_ids_[self._doors_[offset]]
+
+    def door_position(self, identifier):
+        '''Get top-left cell of a door, or None if the door is not in the grid'''
+        slot = self._door_slots_.get(identifier, None)
+        return slot[1] if slot else None
+
+    def probe(self, cells):
+        '''Get (blocked, doors) for a list of (x, y) cells'''
+        blocked = False
+        doors = set()
+        for x, y in cells:
+            offset = self._offset_(x, y)
+            if offset is None:
+                return True, doors
+            blocked |= self._walls_[offset] == 1
+            if self._doors_[offset]:
+                doors.add(self._door_ids_[self._doors_[offset]])
+        return blocked, doors
+
+    def add_door(self, identifier, x, y):
+        '''Place a door with the top-left cell at the given position'''
+        self.remove_door(identifier)
+        if self._free_slots_:
+            slot = self._free_slots_.pop()
+            self._door_ids_[slot] = identifier
+        else:
+            slot = len(self._door_ids_)
+            self._door_ids_.append(identifier)
+        self._door_slots_[identifier] = (slot, (x, y))
+        self._fill_door_(x, y, slot)
+
+    def remove_door(self, identifier):
+        '''Remove a door from the grid'''
+        slot = self._door_slots_.pop(identifier, None)
+        if not slot:
+            return
+        slot, (x, y) = slot
+        self._fill_door_(x, y, NO_DOOR)
+        self._door_ids_[slot] = None
+        self._free_slots_.append(slot)
+
+    def _fill_door_(self, x, y, slot):
+        for y_ofs in range(DOOR_CELLS):
+            for x_ofs in range(DOOR_CELLS):
+                offset = self._offset_(x + x_ofs, y + y_ofs)
+                if offset is not None:
+                    self._doors_[offset] = slot
@@ -8,7 +8,7 @@ from game.common import WARRIOR, VALKYRIE, WIZARD, ELF,\
     HEROES_SPAWN, SPAWN_IDS, KEYS, HERO_CLASS, SCORE, LIFE,\
     INITIAL_HERO_LIFE
 from game.game_object import Actor
-from game.bodies import Box
+from game.bodies import Box, HEROES_LAYER
 from game.sprite import loop_animation, animation
 from game.artwork import WARRIOR_UP, WARRIOR_DOWN, WARRIOR_LEFT, WARRIOR_RIGHT, WARRIOR_UP_LEFT,\
     WARRIOR_DOWN_LEFT, WARRIOR_UP_RIGHT, WARRIOR_DOWN_RIGHT, WARRIOR_EXIT,\
@@ -18,7 +18,7 @@ from game.artwork import WARRIOR_UP, WARRIOR_DOWN, WARRIOR_LEFT, WARRIOR_RIGHT,
     WIZARD_UP_RIGHT, WIZARD_DOWN_RIGHT, WIZARD_EXIT,\
     ELF_UP, ELF_DOWN, ELF_LEFT, ELF_RIGHT, ELF_UP_LEFT, ELF_DOWN_LEFT, ELF_UP_RIGHT,\
     ELF_DOWN_RIGHT, ELF_EXIT
-from game.pyxeltools import HEROES
+from game.pyxeltools import HEROES, use_image_bank
 
 
 class Hero(Actor):
@@ -26,7 +26,7 @@ class Hero(Actor):
     def __init__(self, animations, identifier, spawn_zone):
         super(Hero, self).__init__(animations, identifier=identifier)
         self._spawn_ = spawn_zone
-        self.body = Box()
+        self.body = Box(dynamic=True, layer=HEROES_LAYER)
         self.tags.append('hero')
         self.set_attribute(KEYS, 0)
 
@@ -46,6 +46,7 @@ class Hero(Actor):
 def new(hero_type, actor_identifier=None, attributes=None):
     '''Hero factory'''
     attributes = attributes or {}
+    use_image_bank(HEROES)
     if hero_type == WARRIOR:
         new_actor = Hero({
             'stand_by': loop_animation(HEROES, 4, [WARRIOR_DOWN[0]]),
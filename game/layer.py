@@ -8,60 +8,56 @@
 
 import pyxel
 
-from game.common import EMPTY_TILE, AVAILABLE_OBJECT_IDS, NULL_TILE, WALL_TILES
-from game.pyxeltools import SCREEN_SIZE, TILE_SIZE, CELL_SIZE, FLOOR_TILEMAP, DECORATION_TILEMAP,\
-    clear_tilemap, put_tile
+from game.pyxeltools import SCREEN_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT, CELL_SIZE, CELLS_PER_ROW,\
+    MAX_MAP_WIDTH, MAX_MAP_HEIGHT,\
+    FLOOR_TILEMAP, DECORATION_TILEMAP, MAP_ENTITIES, BACKGROUND, clear_tilemap, set_tilemap_cells,\
+    image_bank_pixels, set_image_bank_pixels, claim_image_bank, image_bank_owner
+from game.artwork import NULL_CELL
 
 
-_SHADOW_ = [
-    EMPTY_TILE, EMPTY_TILE + 1, EMPTY_TILE + 2, EMPTY_TILE + 3,
-    EMPTY_TILE + 4, EMPTY_TILE + 5, EMPTY_TILE + 6, EMPTY_TILE + 5
-]
+# Bake floor and shadows into a single image when the room fits into a image bank
+BAKE_BACKGROUND = True
+
+# Rooms greater than a tilemap bank are paged in windows of this size (in cells),
+# a new window is paged when the visible cells get out of the current one
+PAGE_WIDTH = MAX_MAP_WIDTH
+PAGE_HEIGHT = MAX_MAP_HEIGHT
+
+
+def _page_origin_(first, visible, page, size):
+    '''Start of a page centered on the visible cells'''
+    return max(0, min(first + (visible // 2) - (page // 2), size - page))
+
+
+def _cell_origin_(cell_id):
+    '''Offset of the top-left pixel of a cell in the sheet'''
+    row, column = divmod(cell_id, CELLS_PER_ROW)
+    return (row * CELL_SIZE * SCREEN_WIDTH) + (column * CELL_SIZE)
 
 
 class TileMapLayer:
     '''A simple TileMap layer wrapper class'''
-    def __init__(self, tilemap_data, mask):
-        self._data_ = tilemap_data
+    def __init__(self, compiled_room, mask, bake=BAKE_BACKGROUND):
+        self._room_ = compiled_room
         self._mask_ = mask
-        self._objects_ = []
-        self._compute_walls_()
-        self._compute_shadows_()
+        self._map_width_, self._map_height_ = compiled_room.size
+        # Window of the room held by the tilemaps: (left, top, width, height)
+        self._page_ = (
+            0, 0, min(self._map_width_, PAGE_WIDTH), min(self._map_height_, PAGE_HEIGHT)
+        )
+        clear_tilemap(FLOOR_TILEMAP)
+        clear_tilemap(DECORATION_TILEMAP)
+        self._baked_ = bake and (self.width <= SCREEN_WIDTH) and (self.height <= SCREEN_HEIGHT)
+        # Shadows are only needed to bake the background, the tilemap is not used
+        self._background_ = None
+        self._page_in_(self._page_)
+        if self._baked_:
+            self._bake_()
 
     @property
     def objects(self):
         '''List of objects to be spawn on the level'''
-        return self._objects_
-
-    def _compute_walls_(self):
-        clear_tilemap(FLOOR_TILEMAP)
-        y = 0
-        for row in self._data_:
-            x = 0
-            for src_tile in row:
-                if src_tile in AVAILABLE_OBJECT_IDS:
-                    self._objects_.append((src_tile, (x * TILE_SIZE, y * TILE_SIZE)))
-                    src_tile = EMPTY_TILE
-                if src_tile == NULL_TILE:
-                    src_tile = EMPTY_TILE
-                put_tile(FLOOR_TILEMAP, src_tile, (x * 2, y * 2))
-                x += 1
-            y += 1
-        # Convert tiles to cells
-        self._map_width_, self._map_height_ = x * 2, y * 2
-
-    def _compute_shadows_(self):
-        clear_tilemap(DECORATION_TILEMAP)
-        tiles_width, tiles_height = int(self.map_width / 2), int(self.map_height / 2)
-        for y in range(1, tiles_height - 1):
-            for x in range(1, tiles_width - 1):
-                wall_1 = 1 if self._data_[y][x - 1] in WALL_TILES else 0
-                wall_2 = 1 if self._data_[y + 1][x - 1] in WALL_TILES else 0
-                wall_3 = 1 if self._data_[y + 1][x] in WALL_TILES else 0
-                wall_distribution = (4 * wall_3) + (2 * wall_2) + wall_1
-                if (wall_distribution == 0) or (self._data_[y][x] in WALL_TILES):
-                    continue
-                put_tile(DECORATION_TILEMAP, _SHADOW_[wall_distribution], (x * 2, y * 2))
+        return self._room_.objects
 
     @property
     def width(self):
@@ -93,21 +89,129 @@ class TileMapLayer:
         '''Size of the layer in cells'''
         return (self.map_width, self.map_height)
 
+    @property
+    def page(self):
+        '''Window of the room held by the tilemaps: (left, top, width, height) in cells'''
+        return self._page_
+
+    def _page_in_(self, page):
+        '''Write a window of the room into the tilemaps'''
+        self._page_ = page
+        set_tilemap_cells(FLOOR_TILEMAP, (0, 0), self._room_.floor_rows(page))
+        if not self._baked_:
+            set_tilemap_cells(DECORATION_TILEMAP, (0, 0), self._room_.shadow_rows(page))
+
+    def _ensure_paged_(self, left, top, width, height):
+        '''Page a new window if the given cells are not in the tilemaps'''
+        page_left, page_top, page_width, page_height = self._page_
+        if (page_left <= left) and (left + width <= page_left + page_width) and (
+                page_top <= top) and (top + height <= page_top + page_height):
+            return
+        self._page_in_((
+            _page_origin_(left, width, page_width, self._map_width_),
+            _page_origin_(top, height, page_height, self._map_height_),
+            page_width, page_height
+        ))
+
+    @property
+    def baked(self):
+        '''Floor and shadows are drawn from a single baked image'''
+        return self._baked_
+
+    @staticmethod
+    def _sheet_():
+        '''Sheet used by the tilemaps, as SCREEN_WIDTH x SCREEN_HEIGHT palette indices'''
+        sheet_width, pixels = image_bank_pixels(MAP_ENTITIES)
+        # Pixels out of the sheet are blank (as they are in the image bank)
+        return b''.join(
+            bytes(pixels[offset:offset + sheet_width]).ljust(SCREEN_WIDTH, b'\x00')
+            for offset in range(0, len(pixels), sheet_width)
+        ).ljust(SCREEN_WIDTH * SCREEN_HEIGHT, b'\x00')
+
+    def _compose_cell_(self, sheet, x, y):
+        '''Draw floor and shadow of a cell into the background'''
+        offset = (y * self._map_width_) + x
+        floor, shadow = self._room_.floor[offset], self._room_.shadows[offset]
+        floor = _cell_origin_(floor)
+        shadow = None if shadow == NULL_CELL else _cell_origin_(shadow)
+        target = (y * CELL_SIZE * self.width) + (x * CELL_SIZE)
+        for row in range(CELL_SIZE):
+            self._background_[target:target + CELL_SIZE] = sheet[floor:floor + CELL_SIZE]
+            if shadow is not None:
+                for pixel in range(CELL_SIZE):
+                    color = sheet[shadow + pixel]
+                    if color != self._mask_:
+                        self._background_[target + pixel] = color
+                shadow += SCREEN_WIDTH
+            floor += SCREEN_WIDTH
+            target += self.width
+
+    def _bake_(self):
+        '''Compose floor and shadows into the background image bank'''
+        sheet = self._sheet_()
+        self._background_ = bytearray(self.width * self.height)
+        for y in range(self._map_height_):
+            for x in range(self._map_width_):
+                self._compose_cell_(sheet, x, y)
+        set_image_bank_pixels(BACKGROUND, self._background_, self.width)
+        claim_image_bank(BACKGROUND, self, self.size)
+
+    def _rebake_cell_(self, x, y):
+        if image_bank_owner(BACKGROUND) is not self:
+            # Other contents were loaded into the bank, full bake is done on next render
+            return
+        self._compose_cell_(self._sheet_(), x, y)
+        block = b''.join(
+            self._background_[offset:offset + CELL_SIZE] for offset in range(
+                (y * CELL_SIZE * self.width) + (x * CELL_SIZE),
+                ((y + 1) * CELL_SIZE * self.width),
+                self.width
+            )
+        )
+        set_image_bank_pixels(BACKGROUND, block, CELL_SIZE, (x * CELL_SIZE, y * CELL_SIZE))
+        claim_image_bank(BACKGROUND, self, self.size)
+
     def get_cell_at(self, x, y):
         '''Get cell data of a given coordinates'''
         if (0 <= x < self.map_width) and (0 <= y < self.map_height):
-            return pyxel.tilemap(FLOOR_TILEMAP).get(x, y)
+            return self._room_.floor[(y * self._map_width_) + x]
         raise ValueError('position out of the map')
 
     def set_cell_at(self, x, y, new_value):
         '''Set cell data of a given coordinates'''
         if (0 <= x < self.map_width) and (0 <= y < self.map_height):
-            pyxel.tilemap(FLOOR_TILEMAP).set(x, y, new_value)
+            self._room_.floor[(y * self._map_width_) + x] = new_value
+            page_left, page_top, page_width, page_height = self._page_
+            if (0 <= x - page_left < page_width) and (0 <= y - page_top < page_height):
+                set_tilemap_cells(FLOOR_TILEMAP, (x - page_left, y - page_top), [[new_value]])
+            if self._baked_:
+                self._rebake_cell_(x, y)
             return
         raise ValueError('position out of the map')
 
+    def visible_window(self, x=0, y=0):
+        '''Cells visible on screen when the layer is drawn at (x, y), with a one-cell border'''
+        left = max(0, (-x // CELL_SIZE) - 1)
+        top = max(0, (-y // CELL_SIZE) - 1)
+        right = min(self._map_width_, ((SCREEN_WIDTH - x) // CELL_SIZE) + 1)
+        bottom = min(self._map_height_, ((SCREEN_HEIGHT - y) // CELL_SIZE) + 1)
+        return left, top, max(0, right - left), max(0, bottom - top)
+
     def render(self, x=0, y=0):
         '''Draw layer'''
         pyxel.rect(0, 0, *SCREEN_SIZE, self._mask_)
-        pyxel.bltm(x, y, FLOOR_TILEMAP, 0, 0, self._map_width_, self._map_height_, self._mask_)
-        pyxel.bltm(x, y, DECORATION_TILEMAP, 0, 0, self._map_width_, self._map_height_, self._mask_)
+        if self._baked_:
+            if image_bank_owner(BACKGROUND) is not self:
+                self._bake_()
+            pyxel.blt(x, y, BACKGROUND, 0, 0, self.width, self.height)
+            return
+        u, v, width, height = self.visible_window(x, y)
+        if not (width and height):
+            return
+        self._ensure_paged_(u, v, width, height)
+        x += u * CELL_SIZE
+        y += v * CELL_SIZE
+        u -= self._page_[0]
+        v -= self._page_[1]
+        pyxel.bltm(x, y, FLOOR_TILEMAP, u, v, width, height, self._mask_)
+        pyxel.bltm(x, y, DECORATION_TILEMAP, u, v, width, height, self._mask_)
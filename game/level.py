@@ -82,15 +82,7 @@ class Level(game.GameState):
         self._orchestrator_.parent_level = self
 
     def wake_up(self):
-        game.pyxeltools.load_png_to_image_bank(
-            game.assets.search('map_entities.png'), game.pyxeltools.MAP_ENTITIES
-        )
-        game.pyxeltools.load_png_to_image_bank(
-            game.assets.search('enemies.png'), game.pyxeltools.ENEMIES
-        )
-        game.pyxeltools.load_png_to_image_bank(
-            game.assets.search('heroes.png'), game.pyxeltools.HEROES
-        )
+        # Image banks are loaded (only if needed) by the factories of each object
         self._orchestrator_.start()
 
     def suspend(self):
@@ -122,6 +114,7 @@ class Level(game.GameState):
 
     def make_room(self, name, data):
         '''Room factory'''
+        game.pyxeltools.check_image_banks()
         self.room = game.room.Room(data, self)
 
     def end_current_room(self):
@@ -151,6 +144,13 @@ class Level(game.GameState):
         '''Create a new object'''
         self.room.spawn_at(game.objects.new(object_type, identifier), (x, y))
 
+    def spawn_objects(self, objects):
+        '''Create a list of objects: (object_type, identifier, x, y)'''
+        self.room.spawn_many([
+            (game.objects.new(object_type, identifier), (x, y))
+            for object_type, identifier, x, y in objects
+        ])
+
     def spawn_decoration(self, decoration_type, x, y):
         '''Create a new decoration'''
         self.room.spawn_decoration(decoration_type, (x, y))
@@ -214,6 +214,8 @@ class Level(game.GameState):
             self.spawn_player(*event_parameters)
         elif event_type == 'spawn_object':
             self.spawn_object(*event_parameters)
+        elif event_type == 'spawn_objects':
+            self.spawn_objects(*event_parameters)
         elif event_type == 'spawn_decoration':
             self.spawn_decoration(*event_parameters)
         elif event_type == 'warp_to':
@@ -19,10 +19,10 @@ import game.level
 import game.heroes
 import game.steers
 import game.objects
-from game.common import DOORS, KEYS, AVAILABLE_OBJECT_IDS, EMPTY_TILE, NULL_TILE,\
-    X, Y, TAGS, LIFE, SCORE,\
+import game.roomcache
+from game.common import DOORS, KEYS, X, Y, TAGS, LIFE, SCORE,\
     POINTS_PER_DOOR, POINTS_PER_KEY, POINTS_PER_LEVEL
-from game.pyxeltools import TILE_SIZE, load_json_map
+from game.pyxeltools import TILE_SIZE
 
 
 def _closest_(target, objects=None):
@@ -100,6 +100,8 @@ class RoomOrchestration:
         self._room_ = room
         self._game_objects_ = {}
         self._map_objects_ = []
+        # (hero, door) pairs in contact, retried when the hero gets a key
+        self._door_contacts_ = set()
         self._event_target_ = __discard_event__
         self.parent_level = None
         self._last_time_ = int(time.time())
@@ -128,9 +130,9 @@ class RoomOrchestration:
         '''Start new map'''
         self._game_objects_ = {}
         self._map_objects_ = []
+        self._door_contacts_ = set()
         self._load_map_()
-        for object_type, position in self._map_objects_:
-            self._spawn_object_(object_type, *position)
+        self._spawn_objects_(self._map_objects_)
         self._spawn_player_()
 
     @property
@@ -139,26 +141,27 @@ class RoomOrchestration:
         return self._game_objects_
 
     def _load_map_(self):
-        map_name, map_data = load_json_map(self._room_)
-        # Get objects and replace by empty tile
-        y = 0
-        for row in map_data:
-            x = 0
-            for src_tile in row:
-                if src_tile in AVAILABLE_OBJECT_IDS:
-                    self._map_objects_.append((src_tile, (x * TILE_SIZE, y * TILE_SIZE)))
-                    src_tile = EMPTY_TILE
-                if src_tile == NULL_TILE:
-                    src_tile = EMPTY_TILE
-                map_data[y][x] = src_tile
-                x += 1
-            y += 1
-        # Convert tiles to cells
-        self.send_event(('load_room', map_name, map_data))
+        # Tiles, shadows, walls and objects are extracted at once (or read from the cache
+        # if the room has been played before) and shared with the Room()
+        map_name, compiled_room = game.roomcache.load_room(self._room_)
+        self._map_objects_ = list(compiled_room.objects)
+        self.send_event(('load_room', map_name, compiled_room))
 
     def _spawn_object_(self, object_type, x, y):
         identifier = str(uuid.uuid4())
         self.send_event(('spawn_object', object_type, identifier, x, y))
+        self._track_object_(object_type, identifier, x, y)
+
+    def _spawn_objects_(self, objects):
+        '''Spawn a list of (object_type, (x, y)) with a single event'''
+        spawned = [
+            (object_type, str(uuid.uuid4()), x, y) for object_type, (x, y) in objects
+        ]
+        self.send_event(('spawn_objects', spawned))
+        for object_type, identifier, x, y in spawned:
+            self._track_object_(object_type, identifier, x, y)
+
+    def _track_object_(self, object_type, identifier, x, y):
         if object_type in DOORS:
             object_class = 'door'
         else:
@@ -220,9 +223,13 @@ class RoomOrchestration:
         event_type = event[0]
         event_parameters = event[1:]
 
-        if event_type == 'collision':
+        # Contacts are only notified when they begin, not on every frame
+        if event_type in ('collision', 'contact_begin'):
             self._process_collision_(*event_parameters)
+        elif event_type == 'contact_end':
+            self._door_contacts_.discard(tuple(event_parameters))
         elif event_type == 'kill_object':
+            self._forget_door_contacts_(event_parameters[0])
             if event_parameters[0] in self._game_objects_:
                 del self._game_objects_[event_parameters[0]]
 
@@ -243,6 +250,7 @@ class RoomOrchestration:
                     self._kill_object_(object2.identifier)
                     self._increase_attribute_(object1.identifier, KEYS, 1)
                     self._increase_attribute_(object1.identifier, SCORE, POINTS_PER_KEY)
+                    self._retry_doors_(object1)
                 elif object2.object_type == game.objects.TREASURE:
                     self._kill_object_(object2.identifier)
                     self._spawn_decoration_('smoke', *object2.position)
@@ -272,10 +280,26 @@ class RoomOrchestration:
                     self._increase_attribute_(object1.identifier, SCORE, POINTS_PER_LEVEL)
             elif object2.object_class == 'door':
                 # Player try to open a door
-                if object1.attribute.get(KEYS, 0) > 0:
-                    self._increase_attribute_(object1.identifier, KEYS, -1)
-                    self._increase_attribute_(object1.identifier, SCORE, POINTS_PER_DOOR)
-                    self._open_door_(object2.identifier)
+                self._door_contacts_.add((object1.identifier, object2.identifier))
+                self._try_door_(object1, object2)
+
+    def _try_door_(self, hero, door):
+        if hero.attribute.get(KEYS, 0) > 0:
+            self._increase_attribute_(hero.identifier, KEYS, -1)
+            self._increase_attribute_(hero.identifier, SCORE, POINTS_PER_DOOR)
+            self._forget_door_contacts_(door.identifier)
+            self._open_door_(door.identifier)
+
+    def _retry_doors_(self, hero):
+        '''Contacts are notified once: try again the doors a hero is pushing'''
+        for hero_identifier, door_identifier in sorted(self._door_contacts_):
+            if (hero_identifier == hero.identifier) and (door_identifier in self._game_objects_):
+                self._try_door_(hero, self._game_objects_[door_identifier])
+
+    def _forget_door_contacts_(self, identifier):
+        self._door_contacts_ = {
+            contact for contact in self._door_contacts_ if identifier not in contact
+        }
 
     def update(self):
         '''Game loop iteration'''
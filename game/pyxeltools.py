@@ -6,7 +6,9 @@
     Tools for pyxel
 '''
 
+import os
 import json
+import time
 import logging
 import os.path
 
@@ -14,6 +16,7 @@ import pyxel
 from PIL import Image
 
 import game.assets
+import game.bundle
 from game.artwork import NULL_CELL
 
 
@@ -40,12 +43,35 @@ TILES_PER_ROW = int(SCREEN_WIDTH / TILE_SIZE)
 MAP_ENTITIES = 0
 ENEMIES = 1
 HEROES = 2
+# Screens artwork shares the bank with enemies (not used in-game yet), the
+# residency tracking reloads whichever of them is needed
+SCREENS = ENEMIES
+# Baked room backgrounds use the same bank while playing
+BACKGROUND = ENEMIES
+
+# Default contents of the image banks
+_BANK_ASSETS_ = {
+    MAP_ENTITIES: 'map_entities.png',
+    ENEMIES: 'enemies.png',
+    HEROES: 'heroes.png'
+}
+# What every image bank currently holds: asset, path, version, size and load_time
+_BANK_RESIDENCY_ = {}
+# Palette indices of the sheets loaded into image banks: (width, pixels)
+_BANK_PIXELS_ = {}
+# Resident banks whose file has been checked since the last check_image_banks()
+_CHECKED_BANKS_ = set()
 
 # Used tilemaps by the engine
 #
 FLOOR_TILEMAP = 0
 DECORATION_TILEMAP = 1
 
+# Hexadecimal representation of every cell id used by pyxel when setting tilemaps
+_CELL_HEX_ = ['{:03x}'.format(cell_id) for cell_id in range(1024)]
+# Region (width, height) of every tilemap written since it was cleared
+_TILEMAP_USED_REGION_ = {}
+
 # Palette related
 #
 DEFAULT_PALETTE = [
@@ -53,6 +79,9 @@ DEFAULT_PALETTE = [
     0x0769fd, 0xff6700, 0x00c304, 0x15a9fb, 0xff8068, 0xffff00, 0xfdfffc
 ]
 DEFAULT_COLOR_MASK = 5
+COLOR_COUNT = 16
+# Translation table: palette index (byte) to hexadecimal digit used by pyxel
+_HEX_DIGITS_ = bytes.maketrans(bytes(range(COLOR_COUNT)), b'0123456789abcdef')
 _CURRENT_COLOR_CONFIG_ = {
     'palette': DEFAULT_PALETTE,
     'color_mask': DEFAULT_COLOR_MASK
@@ -73,7 +102,11 @@ def assert_valid_image_bank(bank_id):
 
 def initialize(title='IceDungeon'):
     '''Initialize pyxel'''
-    load_color_config(game.assets.search('palette.json'))
+    bundle = game.bundle.lookup('palette.json')
+    if bundle:
+        set_color_config(json.loads(bundle.data('palette.json')))
+    else:
+        load_color_config(game.assets.search('palette.json'))
     pyxel.init(*SCREEN_SIZE, caption=title, palette=get_palette())
 
 
@@ -97,19 +130,166 @@ def load_png_to_image_bank(image_file, bank):
         raise ValueError(
             'Image cannot be greater than {}x{} pixels'.format(SCREEN_WIDTH, SCREEN_HEIGHT)
         )
+    if image.mode not in ('P', 'L'):
+        raise ValueError('Image must use palette indices, not {}'.format(image.mode))
 
-    for y in range(image.height):
-        for x in range(image.width):
-            pyxel.image(bank).set(x, y, image.getpixel((x, y)))
+    pixels = image.tobytes()
+    set_image_bank_pixels(bank, pixels, image.width)
+    _BANK_PIXELS_[bank] = (image.width, pixels)
     return (image.width, image.height)
 
 
+def set_image_bank_pixels(bank, pixels, width, position=(0, 0)):
+    '''Copy a block of palette indices (one byte per pixel) to a image bank'''
+    assert_valid_image_bank(bank)
+    invalidate_image_bank(bank)
+    if pixels and max(pixels) >= COLOR_COUNT:
+        raise ValueError('Pixel data has colors out of the palette')
+    digits = bytes(pixels).translate(_HEX_DIGITS_).decode('ascii')
+    rows = [digits[offset:offset + width] for offset in range(0, len(digits), width)]
+    pyxel.image(bank).set(position[0], position[1], rows)
+
+
+def _asset_version_(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def use_image_bank(bank, asset=None):
+    '''
+        Ensure that a image bank holds an asset (by default the one assigned to the bank).
+        The PNG file is only loaded if the bank holds other contents or the file changed.
+        Return the size of the image.
+    '''
+    asset = asset or _BANK_ASSETS_[bank]
+    resident = _BANK_RESIDENCY_.get(bank, None)
+    if resident and (resident['asset'] == asset):
+        # Files are checked once per state or room, not in every object factory
+        if bank in _CHECKED_BANKS_:
+            return resident['size']
+        if resident['version'] == _asset_version_(resident['path']):
+            _CHECKED_BANKS_.add(bank)
+            return resident['size']
+
+    start = time.perf_counter()
+    bundle = game.bundle.lookup(asset)
+    if bundle:
+        image_file = bundle.path
+        width, height, pixels = bundle.image(asset)
+        if (width > SCREEN_WIDTH) or (height > SCREEN_HEIGHT):
+            raise ValueError(
+                'Image cannot be greater than {}x{} pixels'.format(SCREEN_WIDTH, SCREEN_HEIGHT)
+            )
+        set_image_bank_pixels(bank, pixels, width)
+        _BANK_PIXELS_[bank] = (width, bytes(pixels))
+        size = (width, height)
+    else:
+        image_file = game.assets.search(asset)
+        if not image_file:
+            raise ValueError('Asset not found: {}'.format(asset))
+        size = load_png_to_image_bank(image_file, bank)
+    load_time = time.perf_counter() - start
+    _BANK_RESIDENCY_[bank] = {
+        'asset': asset,
+        'path': image_file,
+        'version': _asset_version_(image_file),
+        'size': size,
+        'load_time': load_time
+    }
+    _CHECKED_BANKS_.add(bank)
+    logging.debug('Image bank {} loaded with "{}" in {:.2f} ms'.format(
+        bank, asset, load_time * 1000
+    ))
+    return size
+
+
+def invalidate_image_bank(bank):
+    '''Forget contents of a image bank (it will be reloaded on next use)'''
+    _BANK_RESIDENCY_.pop(bank, None)
+    _BANK_PIXELS_.pop(bank, None)
+    _CHECKED_BANKS_.discard(bank)
+
+
+def check_image_banks():
+    '''Check again (on their next use) if the files of the resident image banks changed'''
+    _CHECKED_BANKS_.clear()
+
+
+def image_bank_pixels(bank, asset=None):
+    '''Get the sheet of a image bank as (width, palette indices), loading it if needed'''
+    use_image_bank(bank, asset)
+    return _BANK_PIXELS_[bank]
+
+
+def claim_image_bank(bank, owner, size):
+    '''Mark a image bank as holding contents generated by owner (not loaded from an asset)'''
+    _BANK_RESIDENCY_[bank] = {
+        'asset': owner,
+        'path': None,
+        'version': None,
+        'size': size,
+        'load_time': 0.0
+    }
+    _CHECKED_BANKS_.add(bank)
+
+
+def image_bank_owner(bank):
+    '''Get the asset (or owner of generated contents) held by a image bank'''
+    return _BANK_RESIDENCY_.get(bank, {}).get('asset', None)
+
+
+def image_bank_residency():
+    '''Get what every image bank holds and how long it took to load'''
+    return {bank: dict(resident) for bank, resident in _BANK_RESIDENCY_.items()}
+
+
 def clear_tilemap(tilemap_id):
-    '''Fill with NULL_CELL a entire tilemap bank'''
+    '''Fill with NULL_CELL the used region of a tilemap bank (the entire bank if unknown)'''
+    assert_valid_tilemap_bank(tilemap_id)
+    width, height = _TILEMAP_USED_REGION_.get(tilemap_id, MAX_MAP_SIZE)
+    if width and height:
+        pyxel.tilemap(tilemap_id).set(0, 0, [_CELL_HEX_[NULL_CELL] * width] * height)
+    _TILEMAP_USED_REGION_[tilemap_id] = (0, 0)
+
+
+def _mark_used_region_(tilemap_id, right, bottom):
+    width, height = _TILEMAP_USED_REGION_.get(tilemap_id, MAX_MAP_SIZE)
+    _TILEMAP_USED_REGION_[tilemap_id] = (
+        min(max(width, right), MAX_MAP_WIDTH), min(max(height, bottom), MAX_MAP_HEIGHT)
+    )
+
+
+def set_tilemap_cells(tilemap_id, position, rows):
+    '''Write rows of cells (lists of cell ids) into a tilemap bank at once'''
     assert_valid_tilemap_bank(tilemap_id)
-    for x in range(MAX_MAP_WIDTH):
-        for y in range(MAX_MAP_HEIGHT):
-            pyxel.tilemap(tilemap_id).set(x, y, NULL_CELL)
+    if not rows:
+        return
+    pyxel.tilemap(tilemap_id).set(
+        position[0], position[1], [''.join(map(_CELL_HEX_.__getitem__, row)) for row in rows]
+    )
+    _mark_used_region_(
+        tilemap_id, position[0] + max(map(len, rows)), position[1] + len(rows)
+    )
+
+
+def read_json_map(jsonfile):
+    '''
+        Get the raw JSON of a map without parsing it: (contents, source name).
+        Content of the map can be passed as string as well.
+    '''
+    if jsonfile.lstrip().startswith('{'):
+        return jsonfile.encode('utf-8'), jsonfile
+    bundle = None if os.path.exists(jsonfile) else game.bundle.lookup(jsonfile)
+    if bundle:
+        return bundle.data(jsonfile), jsonfile
+    source = game.assets.search(jsonfile)
+    if not source:
+        raise ValueError('JSON file not found!')
+    with open(source, 'rb') as contents:
+        return contents.read(), source
 
 
 def load_json_map(jsonfile):
@@ -118,42 +298,65 @@ def load_json_map(jsonfile):
         Also support parse the content of the file passed as string
         Return a list of objects in the map.
     '''
-    try:
-        src_map = json.loads(jsonfile)
-    except json.JSONDecodeError:
-        logging.debug('Cannot parse JSON data, trying as filename')
-        jsonfile = game.assets.search(jsonfile)
-        if not jsonfile:
-            raise ValueError('JSON file not found!')
-        with open(jsonfile, 'r') as contents:
-            try:
-                src_map = json.load(contents)
-            except Exception as error:
-                raise ValueError('Wrong JSON data: {}'.format(error))
+    return parse_json_map(*read_json_map(jsonfile))
 
+
+def parse_json_map(contents, source=None):
+    '''
+        Parse the raw JSON of a map, return (map name, map data).
+        Unnamed maps are named after source.
+    '''
+    try:
+        src_map = json.loads(contents)
+    except Exception as error:
+        raise ValueError('Wrong JSON data: {}'.format(error))
     map_data = src_map.get('data', None)
-    map_name = src_map.get('room', os.path.basename(jsonfile))
+    map_name = src_map.get('room', source and os.path.basename(source))
     if not map_data:
         raise ValueError('JSON file does not have a data field')
     return map_name, map_data
 
 
-def put_tile(layer_id, tile_id, position):
-    '''Put a "16 pixel sized" tiled into a "8 pixel sized" tilemap'''
-    assert_valid_tilemap_bank(layer_id)
+def tile_cells(tile_id):
+    '''
+        Return cells of a "16 pixel sized" tile:
+        ((top_left, top_right), (bottom_left, bottom_right))
+    '''
     x = (tile_id % TILES_PER_ROW) * 2
     y = int(tile_id / TILES_PER_ROW) * 2
-    for y_ofs in [0, 1]:
-        for x_ofs in [0, 1]:
-            cell_id = ((y + y_ofs) * CELLS_PER_ROW) + (x + x_ofs)
-            pyxel.tilemap(layer_id).set(position[0] + x_ofs, position[1] + y_ofs, cell_id)
+    return (
+        ((y * CELLS_PER_ROW) + x, (y * CELLS_PER_ROW) + x + 1),
+        (((y + 1) * CELLS_PER_ROW) + x, ((y + 1) * CELLS_PER_ROW) + x + 1)
+    )
+
+
+def tiles_to_cells(tile_rows):
+    '''Convert rows of "16 pixel sized" tiles into rows of "8 pixel sized" cells'''
+    cell_rows = []
+    for row in tile_rows:
+        top, bottom = [], []
+        for tile_id in row:
+            (top_left, top_right), (bottom_left, bottom_right) = tile_cells(tile_id)
+            top += (top_left, top_right)
+            bottom += (bottom_left, bottom_right)
+        cell_rows += (top, bottom)
+    return cell_rows
+
+
+def put_tile(layer_id, tile_id, position):
+    '''Put a "16 pixel sized" tiled into a "8 pixel sized" tilemap'''
+    set_tilemap_cells(layer_id, position, tile_cells(tile_id))
 
 
 def load_color_config(color_config_file):
     '''Load color config from JSON file'''
-    global _CURRENT_COLOR_CONFIG_
     with open(color_config_file, 'r') as contents:
-        loaded_config = json.load(contents)
+        set_color_config(json.load(contents))
+
+
+def set_color_config(loaded_config):
+    '''Set color config from a parsed JSON config'''
+    global _CURRENT_COLOR_CONFIG_
     loaded_config = {
         'palette': _translate_palette_(loaded_config.get('palette', [])),
         'color_mask': int(loaded_config.get('color_mask', DEFAULT_COLOR_MASK))
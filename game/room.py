@@ -6,46 +6,61 @@
     Handling room events and objects
 '''
 
-import logging
-
 from game.layer import TileMapLayer
+from game.compiler import CompiledRoom, compile_room, NO_GROUP
+from game.grid import BlockGrid
+from game.spatial import SpatialHash
 from game.camera import Camera
-from game.common import TILE_ID, DEFAULT_SPAWN
+from game.common import X, Y, DEFAULT_SPAWN
 from game.objects import Spawn, Door
-from game.pyxeltools import get_color_mask
-from game.artwork import BLOCK_CELLS
+from game.pyxeltools import SCREEN_WIDTH, SCREEN_HEIGHT, get_color_mask
 import game.decoration
 
 
-_DOOR_DIRECTION_ = {
-    19: [(0, -1)],
-    20: [(1, 0)],
-    21: [(0, -1), (1, 0)],
-    22: [(0, 1)],
-    23: [(0, -1), (0, 1)],
-    24: [(1, 0), (0, 1)],
-    25: [(0, -1), (1, 0), (0, 1)],
-    26: [(-1, 0)],
-    27: [(-1, 0), (0, -1)],
-    28: [(-1, 0), (1, 0)],
-    29: [(0, -1), (-1, 0), (1, 0)],
-    30: [(-1, 0), (0, 1)],
-    31: [(0, -1), (-1, 0), (0, 1)],
-    32: [(-1, 0), (0, 1), (1, 0)],
-    33: [(0, -1), (-1, 0), (0, 1), (1, 0)]
-}
+# Objects farther than this distance (in pixels) from the camera target are asleep
+# (None to disable), asleep objects are updated once every SLEEP_UPDATE_INTERVAL frames
+SIMULATION_RADIUS = 384
+SLEEP_UPDATE_INTERVAL = 8
+# Greatest number of decorations played at once, others are not spawned
+MAX_DECORATIONS = 16
+
+
+def _in_view_(position, size, view):
+    '''Return if a box (position and size) overlaps the view (left, top, right, bottom)'''
+    return (position[0] < view[2]) and (position[0] + size[0] > view[0]) and (
+        position[1] < view[3]) and (position[1] + size[1] > view[1])
 
 
 class Room:
     '''Container for all in-game elements'''
     def __init__(self, floor_data, parent_game):
+        if not isinstance(floor_data, CompiledRoom):
+            floor_data = compile_room(floor_data)
         self._scenario_ = TileMapLayer(floor_data, mask=get_color_mask())
         self._camera_ = Camera(self._scenario_)
         self._game_ = parent_game
         self._game_objects_ = {}
+        # Subset of game objects that need to be updated every frame
+        self._active_objects_ = {}
+        # Game objects without body (not in the spatial hash)
+        self._unindexed_objects_ = {}
         self._decorations_ = {}
-        self.block = self._compute_walls_collisions_()
-        self._spawns_ = self._get_spawns_()
+        self._frame_ = 0
+        self._bodies_ = SpatialHash()
+        self.block = BlockGrid.from_compiled_room(floor_data)
+        # Groups of connected doors: position of the door -> group and group -> identifiers
+        self._door_group_at_ = {
+            position: group
+            for (_, position), group in zip(floor_data.objects, floor_data.door_groups)
+            if group != NO_GROUP
+        }
+        self._door_groups_ = {}
+        self._door_group_of_ = {}
+        # Pairs of identifiers in contact: the ones of the last frame and the current one
+        self._contacts_ = {}
+        self._frame_contacts_ = {}
+        # Spawn zone -> position, updated as Spawn() objects are created
+        self._spawns_ = {}
 
     @property
     def initial_objects(self):
@@ -57,22 +72,6 @@ class Room:
         '''Map of current-living objects'''
         return self._game_objects_
 
-    def _compute_walls_collisions_(self):
-        block = []
-        for y in range(self._scenario_.map_height):
-            row = []
-            for x in range(self._scenario_.map_width):
-                row.append(self._scenario_.get_cell_at(x, y) in BLOCK_CELLS)
-            block.append(row)
-        return block
-
-    def _get_spawns_(self):
-        spawns = {}
-        for candidate in self._game_objects_.values():
-            if isinstance(candidate, Spawn):
-                spawns[candidate.spawn] = candidate.position
-        return spawns
-
     @property
     def camera(self):
         '''Room camera'''
@@ -97,10 +96,26 @@ class Room:
         self._game_objects_[game_object.identifier] = game_object
         self._game_objects_[game_object.identifier].position = position
         self._game_objects_[game_object.identifier].room = self
-        self._spawns_.update(self._get_spawns_())
+        if game_object.updatable:
+            self._active_objects_[game_object.identifier] = game_object
+        if game_object.body:
+            self._bodies_.insert(game_object)
+        else:
+            self._unindexed_objects_[game_object.identifier] = game_object
+        if isinstance(game_object, Door):
+            self._add_to_door_group_(game_object)
+        elif isinstance(game_object, Spawn):
+            self._spawns_[game_object.spawn] = game_object.position
+
+    def spawn_many(self, placements):
+        '''Spawn a list of (game_object, position) at once'''
+        for game_object, position in placements:
+            self.spawn_at(game_object, position)
 
     def spawn_decoration(self, decoration_id, position):
-        '''Spawn decoration'''
+        '''Spawn decoration (if the budget of concurrent decorations allows it)'''
+        if len(self._decorations_) >= MAX_DECORATIONS:
+            return
         decoration = game.decoration.new(decoration_id, position)
         self._decorations_[decoration.identifier] = decoration
         self._decorations_[decoration.identifier].room = self
@@ -113,90 +128,124 @@ class Room:
             self._game_.player.attribute.update(self._game_objects_[identifier].attribute)
 
         if identifier in self._game_objects_:
+            self._active_objects_.pop(identifier, None)
+            self._unindexed_objects_.pop(identifier, None)
+            self._bodies_.remove(identifier)
+            self._remove_from_door_group_(identifier)
             self._game_objects_[identifier].room = None
             del self._game_objects_[identifier]
         elif identifier in self._decorations_:
             self._decorations_[identifier].room = None
-            del self._decorations_[identifier]
+            game.decoration.release(self._decorations_.pop(identifier))
 
         if identifier == self._game_.identifier:
             self._game_.end_current_room()
 
+    def _add_to_door_group_(self, door):
+        # Doors not defined in the map are not connected to others
+        group = self._door_group_at_.get(tuple(door.position), door.identifier)
+        self._door_groups_.setdefault(group, []).append(door.identifier)
+        self._door_group_of_[door.identifier] = group
+
+    def _remove_from_door_group_(self, identifier):
+        group = self._door_group_of_.pop(identifier, None)
+        if group is None:
+            return
+        self._door_groups_[group].remove(identifier)
+        if not self._door_groups_[group]:
+            del self._door_groups_[group]
+
     def open_door(self, door_identifier):
-        '''Open a existing door'''
-        door_position = self._search_door_(door_identifier)
-        if not door_position:
+        '''Open a existing door (and all doors connected to it)'''
+        group = self._door_group_of_.get(door_identifier, None)
+        if group is None:
             return
-        doors = self._adjacent_doors_(door_position)
-        for door in doors:
+        for door in list(self._door_groups_[group]):
             self.kill(door)
             self.send_event(('kill_object', door))
 
-    def _search_door_(self, door_identifier):
-        if door_identifier not in self._game_objects_:
-            return None
-        y = 0
-        for row in self.block:
-            x = 0
-            for cell in row:
-                if cell == door_identifier:
-                    return (x, y)
-                x += 1
-            y += 1
-        return None
-
-    def _adjacent_doors_(self, location, visited=None):
-        if not visited:
-            visited = []
-        x, y = location
-        if location in visited:
-            return []
-        visited.append((x, y))
-        if (y not in range(len(self.block))) or (x not in range(len(self.block[0]))):
-            return []
-        identifier = self.block[y][x]
-        try:
-            door = self._game_objects_[identifier]
-        except KeyError:
-            logging.debug('Malformed map, object not found: {}'.format(identifier))
-            return []
-        if not isinstance(door, Door):
-            return []
-        doors = [door.identifier]
-        door_tile_id = door.attribute[TILE_ID]
-        for dir_x, dir_y in _DOOR_DIRECTION_[door_tile_id]:
-            doors += self._adjacent_doors_((x + dir_x, y + dir_y), visited)
-        return doors
-
     def update(self):
         '''A game loop iteration'''
-        for game_object in list(self._game_objects_.values()):
+        self._frame_ += 1
+        center = self._camera_.target
+        for index, game_object in enumerate(list(self._active_objects_.values())):
+            # Updates of asleep objects are spread over the frames
+            if (not self.is_awake(game_object, center)) and (
+                    (self._frame_ + index) % SLEEP_UPDATE_INTERVAL):
+                self._keep_contacts_(game_object)
+                continue
             game_object.update()
             if not game_object.acting:
                 self.kill(game_object)
-            if game_object.body:
+            if game_object.body and game_object.body.dynamic:
+                # Static bodies never move nor look for collisions
+                self._bodies_.update(game_object)
                 self.check_collisions_with(game_object)
+        self._update_contacts_()
+
+    def is_awake(self, game_object, center=None):
+        '''Return if a game object is close enough to the camera target to be fully simulated'''
+        if SIMULATION_RADIUS is None:
+            return True
+        center = center or self._camera_.target
+        distance_x = game_object.attribute[X] - center[0]
+        distance_y = game_object.attribute[Y] - center[1]
+        return ((distance_x ** 2) + (distance_y ** 2)) <= (SIMULATION_RADIUS ** 2)
+
+    def touch(self, game_object, other_identifier):
+        '''Annotate that a game object is in contact with other in the current frame'''
+        self._frame_contacts_[(game_object.identifier, other_identifier)] = True
+
+    def _keep_contacts_(self, game_object):
+        '''Contacts of a game object not updated in this frame remain as they were'''
+        for contact in self._contacts_:
+            if contact[0] == game_object.identifier:
+                self._frame_contacts_[contact] = True
+
+    def _update_contacts_(self):
+        '''Send contact events only for the contacts started or ended in this frame'''
+        for contact in self._frame_contacts_:
+            if contact not in self._contacts_:
+                self.send_event(('contact_begin',) + contact)
+        for contact in self._contacts_:
+            if contact not in self._frame_contacts_:
+                self.send_event(('contact_end',) + contact)
+        self._contacts_, self._frame_contacts_ = self._frame_contacts_, {}
 
     def render(self):
         '''Draw a frame'''
         self._camera_.update()
         self._scenario_.render(*self._camera_.position)
 
-        for game_object in self._game_objects_.values():
-            game_object.render(*self._camera_.position)
+        # Only objects in the screen are drawn, animations of the others just advance
+        left, top = -self._camera_.position[0], -self._camera_.position[1]
+        view = (left, top, left + SCREEN_WIDTH, top + SCREEN_HEIGHT)
+        rendered = set()
+        for game_object in list(self._unindexed_objects_.values()) + self._bodies_.query(*view):
+            if _in_view_(game_object.position, game_object.size, view):
+                game_object.render(*self._camera_.position)
+                rendered.add(game_object.identifier)
+        for game_object in list(self._active_objects_.values()):
+            if game_object.identifier not in rendered:
+                game_object.tick()
 
         for decoration in list(self._decorations_.values()):
-            decoration.render(*self._camera_.position)
+            if _in_view_(decoration.position, decoration.size, view):
+                decoration.render(*self._camera_.position)
+            else:
+                decoration.tick()
 
     def check_collisions_with(self, game_object):
-        '''Compute collisions for all game objects'''
-        if not game_object.body:
+        '''Compute collisions of a dynamic game object with the others'''
+        if (not game_object.body) or (not game_object.body.dynamic):
             return
-        for other_game_object in list(self._game_objects_.values()):
-            if (other_game_object is game_object) or (not other_game_object.body):
+        # Only objects in the neighbour buckets can collide
+        for other_game_object in self._bodies_.neighbours(game_object):
+            if (not other_game_object.body) or (
+                    not game_object.body.interacts_with(other_game_object.body)):
                 continue
             if game_object.body.collides_with(other_game_object):
-                self.send_event(('collision', game_object.identifier, other_game_object.identifier))
+                self.touch(game_object, other_game_object.identifier)
 
     def send_event(self, event):
         '''Send event to orchestrator'''
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+
+'''
+    On-disk cache of compiled rooms, keyed by the hash of the room JSON
+
+    Layout: header (magic, compiler version, size in cells, object count, name size), room
+    name, floor cells, shadow cells, wall flags, objects and door group of every object.
+    Numbers are little-endian. Only the MAX_CACHED_ROOMS most recently used rooms are kept.
+'''
+
+import os
+import sys
+import glob
+import struct
+import hashlib
+import logging
+from array import array
+
+import game.compiler
+from game.compiler import CompiledRoom, COMPILER_VERSION
+from game.pyxeltools import read_json_map, parse_json_map
+
+
+CACHE_FOLDER = '$HOME/.icegauntlet/rooms'
+CACHE_EXTENSION = '.room'
+MAX_CACHED_ROOMS = 64
+
+_MAGIC_ = b'IGROOM'
+_HEADER_ = struct.Struct('<6sHHHIH')
+_OBJECT_ = struct.Struct('<HII')
+# Name size used when the room has no name in its JSON
+_NO_NAME_ = 0xffff
+
+
+def _cache_folder_():
+    return os.path.expandvars(os.path.expanduser(CACHE_FOLDER))
+
+
+def _array_bytes_(values):
+    '''Little-endian bytes of an array'''
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _array_from_(typecode, data):
+    '''Array from little-endian bytes'''
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def room_key(contents):
+    '''Key of the compiled room for the given raw JSON'''
+    digest = hashlib.sha256('{}:'.format(COMPILER_VERSION).encode('utf-8'))
+    digest.update(contents)
+    return digest.hexdigest()
+
+
+def dump_room(map_name, compiled_room):
+    '''Serialize a compiled room, map_name can be None if the room has no name'''
+    name = b'' if map_name is None else map_name.encode('utf-8')
+    chunks = [
+        _HEADER_.pack(
+            _MAGIC_, COMPILER_VERSION, compiled_room.width, compiled_room.height,
+            len(compiled_room.objects), _NO_NAME_ if map_name is None else len(name)
+        ),
+        name,
+        _array_bytes_(compiled_room.floor),
+        _array_bytes_(compiled_room.shadows),
+        bytes(compiled_room.block)
+    ]
+    for object_type, (x, y) in compiled_room.objects:
+        chunks.append(_OBJECT_.pack(object_type, x, y))
+    chunks.append(_array_bytes_(compiled_room.door_groups))
+    return b''.join(chunks)
+
+
+def parse_room(data):
+    '''Deserialize a compiled room, return (map name, compiled room)'''
+    magic, version, width, height, object_count, name_size = _HEADER_.unpack_from(data)
+    if (magic != _MAGIC_) or (version != COMPILER_VERSION):
+        raise ValueError('Unsupported compiled room')
+    data = memoryview(data)
+    offset = _HEADER_.size
+    map_name = None
+    if name_size != _NO_NAME_:
+        map_name = str(data[offset:offset + name_size], 'utf-8')
+        offset += name_size
+
+    cells = width * height
+    cell_size = array('H').itemsize
+    floor = _array_from_('H', data[offset:offset + (cells * cell_size)])
+    offset += cells * cell_size
+    shadows = _array_from_('H', data[offset:offset + (cells * cell_size)])
+    offset += cells * cell_size
+    block = bytearray(data[offset:offset + cells])
+    offset += cells
+
+    objects = [
+        (object_type, (x, y)) for object_type, x, y in _OBJECT_.iter_unpack(
+            data[offset:offset + (object_count * _OBJECT_.size)]
+        )
+    ]
+    offset += object_count * _OBJECT_.size
+    door_groups = _array_from_(
+        'i', data[offset:offset + (object_count * array('i').itemsize)]
+    )
+    if (len(floor) != cells) or (len(block) != cells) or (len(objects) != object_count) or (
+            len(door_groups) != object_count):
+        raise ValueError('Truncated compiled room')
+    return map_name, CompiledRoom(
+        width, height, floor, shadows, block, objects, door_groups
+    )
+
+
+def _read_cached_(cache_file):
+    try:
+        with open(cache_file, 'rb') as contents:
+            cached = parse_room(contents.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error) as error:
+        logging.warning('Ignoring compiled room "{}": {}'.format(cache_file, error))
+        return None
+    try:
+        # Used rooms are the last ones to be pruned
+        os.utime(cache_file)
+    except OSError:
+        pass
+    return cached
+
+
+def _write_cached_(cache_file, map_name, compiled_room):
+    temp_file = '{}.{}.tmp'.format(cache_file, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(temp_file, 'wb') as output:
+            output.write(dump_room(map_name, compiled_room))
+        os.replace(temp_file, cache_file)
+    except OSError as error:
+        logging.warning('Cannot store compiled room: {}'.format(error))
+        return
+    _prune_(os.path.dirname(cache_file))
+
+
+def _prune_(cache_folder):
+    '''Remove the least recently used rooms over the limit, older compilers rooms are never used'''
+    entries = []
+    for cache_file in glob.glob(os.path.join(cache_folder, '*' + CACHE_EXTENSION)):
+        try:
+            entries.append((os.path.getmtime(cache_file), cache_file))
+        except OSError:
+            continue
+    entries.sort(reverse=True)
+    for _, cache_file in entries[MAX_CACHED_ROOMS:]:
+        try:
+            os.remove(cache_file)
+        except OSError as error:
+            logging.warning('Cannot remove compiled room: {}'.format(error))
+
+
+def load_room(jsonfile):
+    '''
+        Get (map name, compiled room) of a room given as file or JSON string.
+        Rooms already played are read from the cache, others are compiled and stored.
+    '''
+    contents, source = read_json_map(jsonfile)
+    cache_file = os.path.join(_cache_folder_(), room_key(contents) + CACHE_EXTENSION)
+    cached = _read_cached_(cache_file)
+    if cached:
+        map_name, compiled_room = cached
+        logging.debug('Compiled room loaded from cache: {}'.format(cache_file))
+        return (os.path.basename(source) if map_name is None else map_name), compiled_room
+
+    # Rooms without name are named after their file, that name is not stored into the cache
+    map_name, map_data = parse_json_map(contents)
+    compiled_room = game.compiler.compile_room(map_data)
+    _write_cached_(cache_file, map_name, compiled_room)
+    return (os.path.basename(source) if map_name is None else map_name), compiled_room
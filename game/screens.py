@@ -10,10 +10,11 @@ import pyxel
 
 import game
 import game.assets
+import game.pyxeltools
 from game.common import GAME_SCREEN, STATUS_SCREEN, INITIAL_SCREEN,\
     LEVEL_COUNT, LEVELS
 
-_TILE_SCR_ = 0
+_TILE_SCR_ = game.pyxeltools.SCREENS
 
 
 class StatsScreen(game.GameState):
@@ -24,9 +25,7 @@ class StatsScreen(game.GameState):
     h_center = 0
 
     def wake_up(self):
-        self.tile_resolution = game.pyxeltools.load_png_to_image_bank(
-            game.assets.search('tile.png'), _TILE_SCR_
-        )
+        self.tile_resolution = game.pyxeltools.use_image_bank(_TILE_SCR_, 'tile.png')
         self.h_center = int((pyxel.width / 2) - (self.tile_resolution[0] / 2))
 
     def update(self):
@@ -49,7 +48,7 @@ class TileScreen(game.GameState):
     _blink_ = 0
     _show_message_ = True
     def wake_up(self):
-        game.pyxeltools.load_png_to_image_bank(game.assets.search('tile_screen.png'), _TILE_SCR_)
+        game.pyxeltools.use_image_bank(_TILE_SCR_, 'tile_screen.png')
         self.level = self.parent.player.attribute[LEVEL_COUNT]
 
     def update(self):
@@ -74,9 +73,7 @@ class GameOverScreen(game.GameState):
 
     def wake_up(self):
         self.timeout = 300
-        self.tile_resolution = game.pyxeltools.load_png_to_image_bank(
-            game.assets.search('tile.png'), _TILE_SCR_
-        )
+        self.tile_resolution = game.pyxeltools.use_image_bank(_TILE_SCR_, 'tile.png')
         self.h_center = int((pyxel.width / 2) - (self.tile_resolution[0] / 2))
 
     def update(self):
@@ -98,9 +95,7 @@ class GoodEndScreen(game.GameState):
 
     def wake_up(self):
         self.timeout = 300
-        self.tile_resolution = game.pyxeltools.load_png_to_image_bank(
-            game.assets.search('tile.png'), _TILE_SCR_
-        )
+        self.tile_resolution = game.pyxeltools.use_image_bank(_TILE_SCR_, 'tile.png')
         self.h_center = int((pyxel.width / 2) - (self.tile_resolution[0] / 2))
 
     def update(self):
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+
+'''
+    Spatial hash of game objects bodies (broad phase of collision checking)
+'''
+
+from game.common import X, Y
+
+
+# Size of the buckets in pixels
+BUCKET_SIZE = 32
+
+
+class SpatialHash:
+    '''
+        Uniform grid of buckets. Every body is stored in the buckets overlapped by its
+        extents: a box of its size centered in its position, as used by Box.collides_with()
+    '''
+    def __init__(self, bucket_size=BUCKET_SIZE):
+        self._bucket_size_ = bucket_size
+        self._buckets_ = {}
+        # Identifier -> (game_object, (x, y, width, height), buckets, spawn order)
+        self._entries_ = {}
+        self._sequence_ = 0
+        # Greatest body size ever stored
+        self._max_width_ = self._max_height_ = 0
+
+    def __contains__(self, game_object):
+        return game_object.identifier in self._entries_
+
+    def __len__(self):
+        return len(self._entries_)
+
+    @staticmethod
+    def _extents_(game_object):
+        return (
+            game_object.attribute[X], game_object.attribute[Y],
+            game_object.body.width, game_object.body.height
+        )
+
+    def _buckets_of_(self, extents):
+        x, y, width, height = extents
+        self._max_width_ = max(self._max_width_, width)
+        self._max_height_ = max(self._max_height_, height)
+        left = int((x - (width / 2)) // self._bucket_size_)
+        right = int((x + (width / 2)) // self._bucket_size_)
+        top = int((y - (height / 2)) // self._bucket_size_)
+        bottom = int((y + (height / 2)) // self._bucket_size_)
+        return tuple(
+            (bucket_x, bucket_y)
+            for bucket_y in range(top, bottom + 1) for bucket_x in range(left, right + 1)
+        )
+
+    def insert(self, game_object):
+        '''Add a game object with body'''
+        self.remove(game_object)
+        extents = self._extents_(game_object)
+        buckets = self._buckets_of_(extents)
+        self._sequence_ += 1
+        self._entries_[game_object.identifier] = (game_object, extents, buckets, self._sequence_)
+        for bucket in buckets:
+            self._buckets_.setdefault(bucket, set()).add(game_object.identifier)
+
+    def remove(self, game_object):
+        '''Remove a game object (if present)'''
+        identifier = game_object if isinstance(game_object, str) else game_object.identifier
+        entry = self._entries_.pop(identifier, None)
+        if not entry:
+            return
+        for bucket in entry[2]:
+            contents = self._buckets_[bucket]
+            contents.discard(identifier)
+            if not contents:
+                del self._buckets_[bucket]
+
+    def update(self, game_object):
+        '''Move a game object to its current buckets, only if position or size changed'''
+        entry = self._entries_.get(game_object.identifier, None)
+        if not entry:
+            return
+        extents = self._extents_(game_object)
+        if extents == entry[1]:
+            return
+        buckets = self._buckets_of_(extents)
+        if buckets != entry[2]:
+            for bucket in entry[2]:
+                contents = self._buckets_[bucket]
+                contents.discard(game_object.identifier)
+                if not contents:
+                    del self._buckets_[bucket]
+            for bucket in buckets:
+                self._buckets_.setdefault(bucket, set()).add(game_object.identifier)
+        self._entries_[game_object.identifier] = (game_object, extents, buckets, entry[3])
+
+    def neighbours(self, game_object):
+        '''Game objects sharing any bucket with the given one, in spawn order'''
+        entry = self._entries_.get(game_object.identifier, None)
+        if not entry:
+            return []
+        found = set()
+        for bucket in entry[2]:
+            found.update(self._buckets_.get(bucket, ()))
+        found.discard(game_object.identifier)
+        return [
+            self._entries_[identifier][0]
+            for identifier in sorted(found, key=lambda identifier: self._entries_[identifier][3])
+        ]
+
+    def query(self, left, top, right, bottom):
+        '''Game objects whose box (x, y, width, height) may overlap a rectangle, in spawn order'''
+        # Objects are stored by their centered extents, include the ones at half size distance
+        left = int((left - (self._max_width_ / 2)) // self._bucket_size_)
+        top = int((top - (self._max_height_ / 2)) // self._bucket_size_)
+        right = int(right // self._bucket_size_)
+        bottom = int(bottom // self._bucket_size_)
+        found = set()
+        if (right - left + 1) * (bottom - top + 1) > len(self._buckets_):
+            for bucket, contents in self._buckets_.items():
+                if (left <= bucket[0] <= right) and (top <= bucket[1] <= bottom):
+                    found.update(contents)
+        else:
+            for bucket_y in range(top, bottom + 1):
+                for bucket_x in range(left, right + 1):
+                    found.update(self._buckets_.get((bucket_x, bucket_y), ()))
+        return [
+            self._entries_[identifier][0]
+            for identifier in sorted(found, key=lambda identifier: self._entries_[identifier][3])
+        ]
@@ -36,6 +36,10 @@ class Drawable:
         '''Only used in animations'''
         pass
 
+    def tick(self):
+        '''Advance one frame without drawing (only used in animations)'''
+        pass
+
     @property
     def ended(self):
         '''On Animations this should be redefined'''
@@ -67,34 +71,41 @@ class Raster(Drawable):
         pyxel.blt(x, y, self._bank_, self._xo_, self._yo_, self._width_, self._height_, self._mask_)
 
 
+class AnimationFrames:
+    '''Frame table of an animation, immutable and shared by all Animation() of a sprite'''
+    def __init__(self, loop, ticks_per_frame, frames):
+        self.frames = tuple(frames)
+        self.loop = loop
+        self.ticks_per_frame = ticks_per_frame
+        self.last_frame = len(self.frames) - 1
+        self.width = max([frame.width for frame in self.frames])
+        self.height = max([frame.height for frame in self.frames])
+
+
 class Animation(Drawable):
-    '''A sequence of sprites'''
-    def __init__(self, loop=False, ticks_per_frame=20, *frames):
-        self._frames_ = list(frames)
-        self._loop_ = loop
+    '''Playback of a sequence of sprites (frames are shared through AnimationFrames())'''
+    def __init__(self, loop=False, ticks_per_frame=20, *frames, template=None):
+        self._template_ = template or AnimationFrames(loop, ticks_per_frame, frames)
         self._paused_ = False
-        self._tpf_ = ticks_per_frame
-
         self._current_frame_ = 0
         self._current_tick_ = 0
-        self._last_frame_ = len(self._frames_) - 1
-        self._width_ = max([frame.width for frame in self._frames_])
-        self._height_ = max([frame.height for frame in self._frames_])
 
     @property
     def width(self):
         '''Width in pixels'''
-        return self._width_
+        return self._template_.width
 
     @property
     def height(self):
         '''Height in pixels'''
-        return self._height_
+        return self._template_.height
 
     @property
     def ended(self):
         '''Returns if animation is ended'''
-        return False if self._loop_ else (self._current_frame_ == self._last_frame_)
+        return False if self._template_.loop else (
+            self._current_frame_ == self._template_.last_frame
+        )
 
     def reset(self):
         '''Restart animation'''
@@ -108,26 +119,47 @@ class Animation(Drawable):
 
     def render(self, x=0, y=0):
         '''Draw animation on a given position'''
-        self._frames_[self._current_frame_].render(x, y)
+        self._template_.frames[self._current_frame_].render(x, y)
+        self.tick()
+
+    def tick(self):
+        '''Advance one frame without drawing'''
         if not self.ended and not self._paused_:
             self._current_tick_ += 1
-            if self._current_tick_ > self._tpf_:
+            if self._current_tick_ > self._template_.ticks_per_frame:
                 self._current_tick_ = 0
                 self._current_frame_ += 1
-                if self._current_frame_ > self._last_frame_:
-                    self._current_frame_ = 0 if self._loop_ else self._last_frame_
+                if self._current_frame_ > self._template_.last_frame:
+                    self._current_frame_ = 0 if self._template_.loop else self._template_.last_frame
 
 # Factories
+# Rasters and frame tables already created, shared by every sprite that uses them
+_RASTERS_ = {}
+_ANIMATION_FRAMES_ = {}
+
+
+def raster(image_bank, tile_id):
+    '''Get the (shared) raster of a tile'''
+    key = (image_bank, tile_id, get_color_mask())
+    if key not in _RASTERS_:
+        _RASTERS_[key] = Raster(image_bank, *tile(tile_id))
+    return _RASTERS_[key]
+
+
+def _animation_frames_(image_bank, loop, speed, frame_ids):
+    key = (image_bank, loop, speed, tuple(frame_ids), get_color_mask())
+    if key not in _ANIMATION_FRAMES_:
+        _ANIMATION_FRAMES_[key] = AnimationFrames(
+            loop, speed, [raster(image_bank, frame_id) for frame_id in frame_ids]
+        )
+    return _ANIMATION_FRAMES_[key]
+
+
 def loop_animation(image_bank, speed, frame_ids):
     '''Create a new infinite animation from given image_bank and tiles'''
-    frames = []
-    for frame_id in frame_ids:
-        frames.append(Raster(image_bank, *tile(frame_id)))
-    return Animation(True, speed, *frames)
+    return Animation(template=_animation_frames_(image_bank, True, speed, frame_ids))
+
 
 def animation(image_bank, speed, frame_ids):
     '''Create a one-shot animation from given image_bank and tiles'''
-    frames = []
-    for frame_id in frame_ids:
-        frames.append(Raster(image_bank, *tile(frame_id)))
-    return Animation(False, speed, *frames)
+    return Animation(template=_animation_frames_(image_bank, False, speed, frame_ids))
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# pylint: disable=W0212
+
+'''
+    Tests of the room orchestration
+'''
+
+import unittest
+
+from game.common import DOORS, KEY, KEYS
+from game.orchestration import RoomOrchestration, TrackedGameObject
+
+
+HERO = 'hero'
+DOOR = 'door'
+ITEM_KEY = 'key'
+
+
+class TestDoorContacts(unittest.TestCase):
+    '''A hero pushing a door and picking a key in the same frame'''
+    def setUp(self):
+        self.events = []
+        self.orchestration = RoomOrchestration(None)
+        self.orchestration.event_target = self.events.append
+        self.orchestration._game_objects_[HERO] = TrackedGameObject(HERO, 'hero', 'player')
+        self.orchestration._track_object_(DOORS[0], DOOR, 0, 0)
+        self.orchestration._track_object_(KEY, ITEM_KEY, 16, 0)
+
+    def _receive_(self, *event):
+        self.orchestration.event_handler(event)
+
+    def _hero_keys_(self):
+        return self.orchestration.tracked_objects[HERO].attribute.get(KEYS, 0)
+
+    def test_door_opens_with_key_picked_while_pushing(self):
+        '''The door touched before getting the key opens once the key is picked'''
+        self._receive_('contact_begin', HERO, DOOR)
+        self._receive_('contact_begin', HERO, ITEM_KEY)
+
+        self.assertIn(('open_door', DOOR), self.events)
+        self.assertEqual(self._hero_keys_(), 0)
+
+    def test_door_keeps_closed_after_contact_end(self):
+        '''Doors no longer touched are not opened when a key is picked'''
+        self._receive_('contact_begin', HERO, DOOR)
+        self._receive_('contact_end', HERO, DOOR)
+        self._receive_('contact_begin', HERO, ITEM_KEY)
+
+        self.assertNotIn(('open_door', DOOR), self.events)
+        self.assertEqual(self._hero_keys_(), 1)
+
+    def test_opened_door_is_not_retried(self):
+        '''A door is opened only once, even if more keys are picked'''
+        self._receive_('contact_begin', HERO, DOOR)
+        self._receive_('contact_begin', HERO, ITEM_KEY)
+        self._receive_('kill_object', DOOR)
+        self.orchestration._track_object_(KEY, 'key2', 32, 0)
+        self._receive_('contact_begin', HERO, 'key2')
+
+        self.assertEqual(self.events.count(('open_door', DOOR)), 1)
+        self.assertEqual(self._hero_keys_(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# coding: utf8
+"""
+Tests of the cache of generated Slice modules
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "assignment")
+)
+
+import slice_cache  # pylint: disable=C0413
+
+
+class TestSliceCache(unittest.TestCase):
+    """Generate the modules into a scratch copy of the assignment folder"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.folder, ignore_errors=True)
+        generated_dir = os.path.join(self.folder, "generated")
+        for name, value in (
+            ("ASSIGNMENT_DIR", self.folder),
+            ("GENERATED_DIR", generated_dir),
+        ):
+            patcher = mock.patch.object(slice_cache, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        saved_path = list(sys.path)
+        self.addCleanup(setattr, sys, "path", saved_path)
+        self._forget_module()
+        self.addCleanup(self._forget_module)
+
+    @staticmethod
+    def _forget_module():
+        for module in list(sys.modules):
+            if module == "IceGauntlet" or module.startswith("IceGauntlet."):
+                del sys.modules[module]
+            elif module == "icegauntlet_ice":
+                del sys.modules[module]
+
+    def test_load_imports_generated_module(self):
+        """The IceGauntlet module comes from the generated files"""
+        with mock.patch.object(slice_cache.Ice, "loadSlice") as load_slice:
+            slice_cache.load()
+            load_slice.assert_not_called()
+
+        # pylint: disable=C0415
+        # pylint: disable=E0401
+        import IceGauntlet
+
+        modules_dir = os.path.realpath(slice_cache.GENERATED_DIR)
+        self.assertTrue(IceGauntlet.__file__.startswith(modules_dir + os.sep))
+        self.assertTrue(hasattr(IceGauntlet, "AuthenticationPrx"))
+
+    def test_new_version_replaces_link(self):
+        """Recompiling switches the link and removes the stale modules"""
+        self.assertTrue(slice_cache.compile_slice("0" * 64))
+        stale_dir = os.path.realpath(slice_cache.GENERATED_DIR)
+        self.assertTrue(slice_cache.compile_slice())
+
+        self.assertTrue(os.path.islink(slice_cache.GENERATED_DIR))
+        self.assertFalse(os.path.exists(stale_dir))
+        self.assertEqual(
+            slice_cache._generated_hash(),  # pylint: disable=W0212
+            slice_cache._slice_hash(),  # pylint: disable=W0212
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()